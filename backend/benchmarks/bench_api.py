@@ -0,0 +1,184 @@
+"""
+In-process load test of the game API: drives the FastAPI app through
+httpx's ASGI transport (no network, no MongoDB) with a stand-in vocabulary
+snapshot, and reports latency percentiles, throughput and peak RSS per
+scenario:
+
+    new          POST /game/new (practice, random secrets)
+    guess_vocab  POST /game/guess with vocabulary words
+    guess_oov    POST /game/guess with never-seen words (runs the encoder)
+    guess_repeat POST /game/guess with one out-of-vocabulary word (cached)
+    hint         GET /hint
+
+Game errors the API answers with a 200 (a guess with rank -1) count as
+errors. The two out-of-vocabulary scenarios are skipped when the encoder
+can't run, rather than timing its error responses.
+
+    cd backend
+    python -m benchmarks.bench_api --requests 2000 --concurrency 32 --json api.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import string
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+import numpy as np
+import config
+from benchmarks.common import Timer, failed, percentiles, print_table, write_json
+from script.snapshot import write_snapshot
+
+SCENARIOS = ("new", "guess_vocab", "guess_oov", "guess_repeat", "hint")
+ENCODER_SCENARIOS = ("guess_oov", "guess_repeat")
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def stand_in_vocabulary(size: int, dim: int, seed: int):
+    """Pronounceable-ish unique words and random unit vectors"""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))))
+    matrix = np.random.default_rng(seed).standard_normal((size, dim), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return sorted(words), matrix
+
+
+def prepare_snapshot(args) -> str:
+    """The --snapshot file, or a stand-in one written to a temp dir"""
+    if args.snapshot:
+        return args.snapshot
+    words, matrix = stand_in_vocabulary(args.vocab_size, args.dim, args.seed)
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_api_"), "vocabulary.snapshot")
+    write_snapshot(path, words, matrix, config.MODEL_NAME)
+    return path
+
+
+async def run_scenario(client, make_request: Callable, total: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if failed(response):
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        **percentiles(latencies),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def bench(app, words: List[str], args) -> Dict[str, Dict]:
+    import httpx
+
+    rng = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        games = []
+        for _ in range(args.games):
+            games.append((await client.post("/game/new", params={"mode": "practice"})).json()["game_id"])
+
+        def guess(word_for: Callable[[int], str]):
+            async def request(client, i):
+                return await client.post("/game/guess", json={"game_id": games[i % len(games)], "word": word_for(i)})
+            return request
+
+        async def new_game(client, i):
+            return await client.post("/game/new", params={"mode": "practice", "difficulty": rng.choice(["easy", "medium", "hard"])})
+
+        async def hint(client, i):
+            return await client.get("/hint", params={"game_id": games[i % len(games)]})
+
+        requests = {
+            "new": new_game,
+            "guess_vocab": guess(lambda i: rng.choice(words)),
+            "guess_oov": guess(lambda i: f"{rng.choice(words)}q{i}"),
+            "guess_repeat": guess(lambda i: "benchmarkword"),
+            "hint": hint,
+        }
+        for name in args.scenarios:
+            results[name] = await run_scenario(client, requests[name], args.requests, args.concurrency)
+            row = results[name]
+            print(f"{name}: {row['throughput_rps']} req/s, p50 {row['p50_ms']}ms, p99 {row['p99_ms']}ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot", default=None, help="Use this vocabulary snapshot instead of a stand-in")
+    parser.add_argument("--vocab-size", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--games", type=int, default=50, help="Games the guess and hint scenarios spread over")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    # The app's modules copy these settings when imported, so override
+    # them before importing it: local snapshot, in-memory sessions, no MongoDB
+    config.SNAPSHOT_PATH = prepare_snapshot(args)
+    config.SESSION_BACKEND = "memory"
+    config.DAILY_STATS_FLUSH_SECONDS = 0
+    config.MAX_SESSIONS = max(args.requests * 2, config.MAX_SESSIONS)
+
+    import main as server
+
+    with Timer() as warmup:
+        server.lazy_init()
+    print(f"Warmup: {warmup.ms:.0f}ms, peak RSS {peak_rss_mb()}MB")
+
+    skipped = [name for name in args.scenarios if name in ENCODER_SCENARIOS]
+    if skipped:
+        try:
+            # Scored like a real guess, so a model of the wrong size is caught too
+            server.app_state.game_manager.scorer.calculate_score("benchmarkprobe", server.app_state.word_list[0])
+            skipped = []
+        except Exception as e:
+            print(f"❌ Encoder unavailable ({type(e).__name__}: {e}), skipping {', '.join(skipped)}")
+            args.scenarios = [name for name in args.scenarios if name not in skipped]
+            if not args.scenarios:
+                server.shutdown_event()
+                sys.exit("No scenarios left to run")
+
+    results = asyncio.run(bench(server.app, server.app_state.word_list, args))
+    server.shutdown_event()
+
+    rows = [{"scenario": name, **row} for name, row in results.items()]
+    print()
+    print_table(rows, ["scenario", "requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb"])
+    write_json(args.json_path, {
+        "python": sys.version.split()[0],
+        "vocab_size": len(server.app_state.word_list),
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "warmup_ms": round(warmup.ms, 1),
+        "skipped": skipped,
+        "scenarios": results,
+    })
+
+
+if __name__ == "__main__":
+    main()
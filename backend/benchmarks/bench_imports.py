@@ -0,0 +1,87 @@
+"""
+Import-time profile of the server (`python -X importtime`): total time to
+import a module in a fresh interpreter, the slowest top-level packages,
+and which heavy dependencies got imported at all.
+
+    cd backend
+    python -m benchmarks.bench_imports --module main --runs 5 --json imports.json
+"""
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, List
+import numpy as np
+from benchmarks.common import print_table, write_json
+
+# Dependencies that should only load behind the feature that needs them
+HEAVY = ("torch", "sentence_transformers", "transformers", "onnxruntime", "faiss",
+         "nltk", "scipy", "sklearn", "motor", "pymongo")
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(module: str) -> List[Dict]:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in out.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "name": name,
+                "depth": len(indent) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            })
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    runs = [profile(args.module) for _ in range(args.runs)]
+    totals = [sum(e["cumulative_ms"] for e in run if e["depth"] == 0) for run in runs]
+
+    # Time spent in each root package's own modules (self time summed), median across runs
+    packages: Dict[str, List[float]] = {}
+    for run in runs:
+        per_run: Dict[str, float] = {}
+        for entry in run:
+            root = entry["name"].split(".")[0]
+            per_run[root] = per_run.get(root, 0.0) + entry["self_ms"]
+        for root, ms in per_run.items():
+            packages.setdefault(root, []).append(ms)
+    rows = sorted(
+        ({"package": name, "self_ms": round(float(np.median(values)), 1)} for name, values in packages.items()),
+        key=lambda row: -row["self_ms"]
+    )[:args.top]
+
+    imported = {entry["name"].split(".")[0] for entry in runs[0]}
+    heavy = {name: name in imported for name in HEAVY}
+
+    print(f"import {args.module}: median {np.median(totals):.0f}ms over {args.runs} runs "
+          f"(min {min(totals):.0f}ms, max {max(totals):.0f}ms)")
+    print()
+    print_table(rows, ["package", "self_ms"])
+    print()
+    print("heavy dependencies imported: " + (", ".join(n for n, loaded in heavy.items() if loaded) or "none"))
+
+    write_json(args.json_path, {
+        "module": args.module,
+        "total_ms": {"median": round(float(np.median(totals)), 1), "runs": [round(t, 1) for t in totals]},
+        "top_packages": rows,
+        "heavy_imported": heavy,
+    })
+
+
+if __name__ == "__main__":
+    main()
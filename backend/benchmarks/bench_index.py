@@ -0,0 +1,72 @@
+"""
+Compare FAISS index types (flat / hnsw / ivf) on the vocabulary matrix:
+build time, memory, query latency and recall@k against exact search.
+
+    cd backend
+    python -m benchmarks.bench_index --queries 500 --k 20
+"""
+import argparse
+import faiss
+import numpy as np
+from benchmarks.common import Timer, add_matrix_args, load_matrix, percentiles, print_table, write_json
+from script.index import INDEX_TYPES, build_index
+
+
+def index_bytes(index) -> int:
+    return len(faiss.serialize_index(index))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_matrix_args(parser)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--hnsw-ef-search", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--ivf-nlist", type=int, default=100)
+    parser.add_argument("--ivf-nprobe", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    matrix = np.ascontiguousarray(load_matrix(args), dtype=np.float32)
+    rng = np.random.default_rng(args.seed)
+    queries = matrix[rng.choice(len(matrix), size=min(args.queries, len(matrix)), replace=False)]
+
+    # Ground truth from exact search
+    exact = build_index(matrix, "flat")
+    _, truth = exact.search(queries, args.k)
+
+    configs = [("flat", {})]
+    configs += [("hnsw", {"hnsw_m": args.hnsw_m, "hnsw_ef_search": ef}) for ef in args.hnsw_ef_search]
+    configs += [("ivf", {"ivf_nlist": args.ivf_nlist, "ivf_nprobe": p}) for p in args.ivf_nprobe]
+    assert {name for name, _ in configs} <= set(INDEX_TYPES)
+
+    rows = []
+    for index_type, params in configs:
+        with Timer() as build:
+            index = build_index(matrix, index_type, **params)
+
+        latencies = []
+        found = np.empty_like(truth)
+        for i, query in enumerate(queries):
+            with Timer() as t:
+                _, ids = index.search(query[None, :], args.k)
+            latencies.append(t.ms)
+            found[i] = ids[0]
+
+        recall = np.mean([len(set(f) & set(g)) / args.k for f, g in zip(found, truth)])
+        rows.append({
+            "index": index_type,
+            "params": ",".join(f"{k}={v}" for k, v in params.items()) or "-",
+            "build_ms": round(build.ms, 1),
+            "mbytes": round(index_bytes(index) / 1e6, 2),
+            f"recall@{args.k}": round(float(recall), 4),
+            **percentiles(latencies),
+        })
+
+    print()
+    print_table(rows, list(rows[0].keys()))
+    write_json(args.json_path, {"vectors": len(matrix), "dim": matrix.shape[1], "results": rows})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare vocabulary matrix storage types (float32 / float16 / int8 / pq):
+memory, whole-vocabulary scoring latency (and its cost over float32,
+paid on every ranking build) and how far the ranking drifts from
+float32 for a sample of secrets.
+
+Ranks use the semantic layer only (the one quantization touches); the
+lexical and category layers are identical across storage types.
+
+    cd backend
+    python -m benchmarks.bench_quantization --secrets 50
+"""
+import argparse
+import numpy as np
+from benchmarks.common import Timer, add_matrix_args, load_matrix, percentiles, print_table, write_json
+from script.quantization import STORAGE_TYPES, quantize
+
+
+def rank_positions(scores: np.ndarray) -> np.ndarray:
+    order = np.argsort(-scores, kind="stable")
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return ranks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_matrix_args(parser)
+    parser.add_argument("--secrets", type=int, default=50)
+    parser.add_argument("--top", type=int, default=100, help="Size of the neighbourhood to compare")
+    parser.add_argument("--pq-m", type=int, default=48)
+    parser.add_argument("--pq-nbits", type=int, default=8)
+    args = parser.parse_args()
+
+    source = np.ascontiguousarray(load_matrix(args), dtype=np.float32)
+    rng = np.random.default_rng(args.seed)
+    secrets = rng.choice(len(source), size=min(args.secrets, len(source)), replace=False)
+
+    baseline = quantize(source, "float32")
+    reference = {int(s): baseline.cosine(source[s]) for s in secrets}
+
+    rows = []
+    for storage in STORAGE_TYPES:
+        with Timer() as build:
+            matrix = quantize(source, storage, pq_m=args.pq_m, pq_nbits=args.pq_nbits)
+        matrix.norms  # warm the cached norms outside the timed loop
+
+        latencies, displacement, overlap, max_shift = [], [], [], []
+        for secret in secrets:
+            with Timer() as t:
+                scores = matrix.cosine(source[secret])
+            latencies.append(t.ms)
+
+            ref_scores = reference[int(secret)]
+            ref_ranks, ranks = rank_positions(ref_scores), rank_positions(scores)
+            top = np.argsort(-ref_scores)[:args.top]
+            shift = np.abs(ranks[top] - ref_ranks[top])
+            displacement.append(shift.mean())
+            max_shift.append(shift.max())
+            overlap.append(len(set(top) & set(np.argsort(-scores)[:args.top])) / args.top)
+
+        rows.append({
+            "storage": storage,
+            "mbytes": round(matrix.nbytes / 1e6, 2),
+            "build_ms": round(build.ms, 1),
+            f"top{args.top}_overlap": round(float(np.mean(overlap)), 4),
+            "mean_rank_shift": round(float(np.mean(displacement)), 2),
+            "max_rank_shift": int(np.max(max_shift)),
+            **percentiles(latencies),
+        })
+
+    base_p50 = rows[0]["p50_ms"]
+    for row in rows:
+        row["p50_vs_float32"] = round(row["p50_ms"] / base_p50, 2) if base_p50 else None
+
+    print()
+    print_table(rows, list(rows[0].keys()))
+    print()
+    for row in rows[1:]:
+        extra = row["p50_ms"] - base_p50
+        print(f"⏱️  {row['storage']}: {row['mbytes']}MB instead of {rows[0]['mbytes']}MB, "
+              f"scoring {row['p50_vs_float32']}x float32 ({extra:+.2f}ms p50 per ranking build)")
+    write_json(args.json_path, {"vectors": len(source), "dim": source.shape[1], "results": rows})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Cold-start benchmark: runs the server warmup in fresh processes and
+reports how long each stage takes (imports, vocabulary, model,
+embeddings, WordNet tables, game manager).
+
+    cd backend
+    python -m benchmarks.bench_startup --runs 3 --json startup.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import numpy as np
+from benchmarks.common import print_table, write_json
+
+CHILD_FLAG = "--child"
+
+
+def child():
+    start = time.perf_counter()
+    from warmup import Warmup, build_game_manager
+    imports_ms = (time.perf_counter() - start) * 1000
+
+    warmup = Warmup()
+    build_game_manager(warmup)
+    stages = {"imports": round(imports_ms, 1), **warmup.report()["stages_ms"]}
+    print(json.dumps(stages))
+
+
+def run_child() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", CHILD_FLAG],
+        capture_output=True, text=True, check=True
+    )
+    # Last line is the JSON report, everything above is server logging
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    runs = []
+    for i in range(args.runs):
+        runs.append(run_child())
+        print(f"run {i + 1}/{args.runs}: {sum(runs[-1].values()):.0f}ms")
+
+    stages = list(runs[0].keys())
+    rows = []
+    for stage in stages + ["total"]:
+        values = [sum(r.values()) if stage == "total" else r[stage] for r in runs]
+        rows.append({
+            "stage": stage,
+            "mean_ms": round(float(np.mean(values)), 1),
+            "min_ms": round(float(np.min(values)), 1),
+            "max_ms": round(float(np.max(values)), 1),
+        })
+
+    print()
+    print_table(rows, ["stage", "mean_ms", "min_ms", "max_ms"])
+    write_json(args.json_path, {"runs": runs, "summary": rows})
+
+
+if __name__ == "__main__":
+    if CHILD_FLAG in sys.argv:
+        child()
+    else:
+        main()
@@ -0,0 +1,184 @@
+"""
+Multi-worker benchmark: starts serve.py with 1..N uvicorn workers and
+reports per-worker memory (RSS, and PSS which splits shared pages such as
+the memory-mapped snapshot between the processes using them) and
+requests/sec for a new-game + guesses workload. Sessions go through a
+shared backend (a fresh SQLite file per run by default) since requests
+land on any worker; error responses are counted, not as throughput.
+Linux only (/proc).
+
+    cd backend
+    python -m benchmarks.bench_workers --workers 1 2 4 --encoder-process --json workers.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+import httpx
+from benchmarks.common import failed, percentiles, print_table, write_json
+from config import SNAPSHOT_PATH
+from script.snapshot import load_snapshot
+
+
+def children_of(pid: int) -> List[int]:
+    """All descendant processes of pid"""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    found, frontier = [], [pid]
+    while frontier:
+        parent = frontier.pop()
+        kids = [p for p, pp in parents.items() if pp == parent]
+        found.extend(kids)
+        frontier.extend(kids)
+    return found
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key.lower()] = int(rest.split()[0])
+    except OSError:
+        pass
+    return values
+
+
+def wait_ready(server: subprocess.Popen, base_url: str, workers: int, timeout: float) -> bool:
+    """Every worker warms up on its own; wait until several probes in a row pass"""
+    deadline = time.monotonic() + timeout
+    streak = 0
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            ok = httpx.get(f"{base_url}/readyz", timeout=2).status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        streak = streak + 1 if ok else 0
+        if streak >= 3 * workers:
+            return True
+        time.sleep(0.2)
+    return False
+
+
+async def play(client: httpx.AsyncClient, words: List[str], guesses: int, latencies: List[float], errors: List[int]):
+    start = time.perf_counter()
+    r = await client.post("/game/new", params={"mode": "practice"})
+    if failed(r):
+        errors[0] += 1
+        return
+    latencies.append((time.perf_counter() - start) * 1000)
+    game_id = r.json()["game_id"]
+    for _ in range(guesses):
+        word = random.choice(words) if random.random() < 0.9 else f"{random.choice(words)}xq"
+        start = time.perf_counter()
+        r = await client.post("/game/guess", json={"game_id": game_id, "word": word})
+        if failed(r):
+            errors[0] += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def load(base_url: str, words: List[str], concurrency: int, duration: float, guesses: int) -> Dict:
+    latencies: List[float] = []
+    errors = [0]
+    deadline = time.monotonic() + duration
+
+    async def player(client):
+        while time.monotonic() < deadline:
+            await play(client, words, guesses, latencies, errors)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(player(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "req_s": round(len(latencies) / elapsed, 1),
+        **percentiles(latencies or [0.0])
+    }
+
+
+def run(workers: int, args, words: List[str]) -> Dict:
+    port = args.port
+    cmd = [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1"]
+    if args.encoder_process:
+        cmd.append("--encoder-process")
+    env = dict(os.environ, SESSION_BACKEND=args.session_backend)
+    if args.session_backend == "sqlite":
+        env["SESSION_SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_workers_"), "sessions.sqlite3")
+    server = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        if not wait_ready(server, base_url, workers, args.ready_timeout):
+            raise RuntimeError(f"{workers} workers did not become ready")
+        result = asyncio.run(load(base_url, words, args.concurrency, args.duration, args.guesses))
+
+        processes = [memory_kb(pid) for pid in [server.pid, *children_of(server.pid)]]
+        processes = [p for p in processes if p]
+        total_pss = sum(p.get("pss", 0) for p in processes)
+        # The biggest processes are the app workers (plus the encoder service, if any)
+        worker_rss = sorted((p.get("rss", 0) for p in processes), reverse=True)[:workers]
+        return {
+            "workers": workers,
+            "processes": len(processes),
+            "rss_mb_per_worker": round(sum(worker_rss) / len(worker_rss) / 1024, 1),
+            "total_pss_mb": round(total_pss / 1024, 1),
+            "pss_mb_per_worker": round(total_pss / workers / 1024, 1),
+            **result
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--encoder-process", action="store_true")
+    parser.add_argument("--session-backend", choices=["sqlite", "mongo"], default="sqlite",
+                        help="Shared session store the workers use")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--guesses", type=int, default=10, help="Guesses per game")
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    snapshot = load_snapshot(SNAPSHOT_PATH)
+    if snapshot is None:
+        sys.exit(f"No vocabulary snapshot at {SNAPSHOT_PATH}; run `python -m script.build_snapshot` first")
+    words = snapshot.words
+
+    rows = []
+    for workers in args.workers:
+        rows.append(run(workers, args, words))
+        print(f"{workers} workers: {rows[-1]['req_s']} req/s, {rows[-1]['errors']} errors, "
+              f"{rows[-1]['pss_mb_per_worker']}MB PSS/worker")
+
+    print()
+    print_table(rows, ["workers", "processes", "rss_mb_per_worker", "pss_mb_per_worker", "total_pss_mb",
+                       "req_s", "errors", "p50_ms", "p95_ms", "p99_ms"])
+    write_json(args.json_path, {
+        "encoder_process": args.encoder_process,
+        "session_backend": args.session_backend,
+        "results": rows
+    })
+
+
+if __name__ == "__main__":
+    main()
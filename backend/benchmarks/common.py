@@ -0,0 +1,78 @@
+import json
+import time
+import numpy as np
+from typing import Dict, List
+from config import SNAPSHOT_PATH
+from script.snapshot import load_snapshot
+
+
+def add_matrix_args(parser):
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH,
+                        help="Vocabulary snapshot to take the embedding matrix from")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Use N random unit vectors instead of the real matrix")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None,
+                        help="Also write the results to this JSON file")
+
+
+def load_matrix(args) -> np.ndarray:
+    """Real vocabulary matrix when available, otherwise random unit vectors"""
+    snapshot = None if args.synthetic else load_snapshot(args.snapshot)
+    if snapshot is not None:
+        return snapshot.embeddings
+
+    n = args.synthetic or 10_000
+    print(f"Using {n} synthetic {args.dim}-d vectors (recall numbers are pessimistic)")
+    rng = np.random.default_rng(args.seed)
+    matrix = rng.standard_normal((n, args.dim), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples_ms)
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p95_ms": round(float(np.percentile(values, 95)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4),
+    }
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self.start) * 1000
+
+
+def failed(response) -> bool:
+    """
+    HTTP errors, and game errors the API answers with a 200: /game/guess
+    reports them as rank -1 with a message, other routes as an 'error' key
+    """
+    if response.status_code >= 400:
+        return True
+    try:
+        body = response.json()
+    except ValueError:
+        return True
+    return isinstance(body, dict) and (bool(body.get("error")) or body.get("rank") == -1)
+
+
+def print_table(rows: List[Dict], columns: List[str]):
+    widths = [max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(w) for c, w in zip(columns, widths)))
+
+
+def write_json(path, payload):
+    if not path:
+        return
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Results written to {path}")
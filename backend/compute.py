@@ -0,0 +1,55 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict
+
+
+class ComputeBusy(Exception):
+    """Raised when the compute pool's queue is full (mapped to HTTP 503)"""
+
+
+class ComputePool:
+    """
+    Bounded executor for CPU-heavy work: game initialization and
+    out-of-vocabulary scoring. Keeps model inference off the event loop
+    and out of Starlette's shared threadpool, and rejects work instead of
+    queueing forever once `max_workers + max_queue` calls are in flight.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 64):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="compute")
+        # Only touched from the event loop thread, no lock needed
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ComputeBusy()
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # Run in the request's context so its timing spans reach Server-Timing
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self._executor, context.run, partial(fn, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'in_flight': self.in_flight,
+            'queued': max(0, self.in_flight - self.max_workers),
+            'completed': self.completed,
+            'rejected': self.rejected
+        }
@@ -0,0 +1,119 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(BASE_DIR, "data"))
+
+# Sentence transformer used for every embedding in the game
+MODEL_NAME = os.getenv("MODEL_NAME", "paraphrase-MiniLM-L3-v2")
+
+# In-process inference: torch (sentence-transformers) or onnx (ONNX Runtime,
+# export with `python -m script.export_onnx`; ONNX_INT8=1 uses the
+# dynamically quantized model)
+ENCODER_BACKEND = os.getenv("ENCODER_BACKEND", "torch")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(DATA_DIR, "onnx", MODEL_NAME))
+ONNX_INT8 = os.getenv("ONNX_INT8", "0") == "1"
+
+# lazy: load the model on the first word that isn't in the vocabulary or
+# embedding cache, on a compute worker (startup skips importing
+# torch/onnxruntime, and workers that never see such a word never do);
+# eager: load it during warmup so that first guess doesn't wait for it
+MODEL_LOAD = os.getenv("MODEL_LOAD", "lazy")
+
+# Local vocabulary snapshot (words, frequency ranks, normalized float32
+# embedding matrix) the server boots from; MongoDB only refreshes it
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join(DATA_DIR, "vocabulary.snapshot"))
+
+# Number of per-secret rankings kept in memory (shared across sessions)
+RANKING_CACHE_SIZE = int(os.getenv("RANKING_CACHE_SIZE", 32))
+
+# Easy/medium/hard secret tiers written by `python -m script.difficulty`;
+# without the file, tiers are slices of the frequency-ordered vocabulary
+DIFFICULTY_TIERS_PATH = os.getenv("DIFFICULTY_TIERS_PATH", os.path.join(DATA_DIR, "difficulty_tiers.json"))
+
+# Practice secrets with rankings ready ahead of demand: archives written by
+# `python -m script.secret_pool` (SECRET_POOL_SIZE secrets per difficulty)
+# are memory-mapped from SECRET_POOL_DIR; difficulties without one keep
+# SECRET_POOL_WARM rankings built in the background (0 disables)
+SECRET_POOL_DIR = os.getenv("SECRET_POOL_DIR", os.path.join(DATA_DIR, "secret_pool"))
+SECRET_POOL_SIZE = int(os.getenv("SECRET_POOL_SIZE", 200))
+SECRET_POOL_WARM = int(os.getenv("SECRET_POOL_WARM", 4))
+
+# Game sessions: dropped after SESSION_TTL_SECONDS idle, least recently
+# used ones evicted beyond MAX_SESSIONS
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 6 * 3600))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", 10000))
+
+# Where sessions live: memory (this process only), sqlite (all workers on
+# one host) or mongo (game_sessions collection). Shared backends are
+# written behind in batches every SESSION_FLUSH_MS / SESSION_FLUSH_BATCH games
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", os.path.join(DATA_DIR, "sessions.sqlite3"))
+SESSION_FLUSH_MS = float(os.getenv("SESSION_FLUSH_MS", 50))
+SESSION_FLUSH_BATCH = int(os.getenv("SESSION_FLUSH_BATCH", 256))
+# Games with unwritten changes kept at most; beyond that changes are dropped
+SESSION_MAX_PENDING = int(os.getenv("SESSION_MAX_PENDING", 10000))
+
+# How often daily-mode stats recorded by this worker are added to the
+# shared summary in MongoDB (0 disables; stats then stay per process)
+DAILY_STATS_FLUSH_SECONDS = int(os.getenv("DAILY_STATS_FLUSH_SECONDS", 60))
+
+# Process-wide FAISS index for nearest-word search, built on first use
+# (hints walk the precomputed ranking instead): flat (exact), hnsw or ivf
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")
+FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", 32))
+FAISS_HNSW_EF_SEARCH = int(os.getenv("FAISS_HNSW_EF_SEARCH", 64))
+FAISS_IVF_NLIST = int(os.getenv("FAISS_IVF_NLIST", 100))
+FAISS_IVF_NPROBE = int(os.getenv("FAISS_IVF_NPROBE", 8))
+
+# Single-word embedding LRU for out-of-vocabulary guesses (vocabulary is always cached)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 5000))
+# Optional .npy file the cache is saved to on shutdown and warmed from on start
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+
+# Out-of-vocabulary guesses that are inflections (cats, running, mice) or,
+# with GUESS_TYPOS, one-edit typos of a vocabulary word get that word's
+# precomputed score instead of a model call
+GUESS_VARIANTS = os.getenv("GUESS_VARIANTS", "1") == "1"
+GUESS_TYPOS = os.getenv("GUESS_TYPOS", "1") == "1"
+
+# Micro-batching of concurrent single-word encodes
+ENCODER_MAX_BATCH_SIZE = int(os.getenv("ENCODER_MAX_BATCH_SIZE", 32))
+ENCODER_MAX_WAIT_MS = float(os.getenv("ENCODER_MAX_WAIT_MS", 2.0))
+
+# Unix socket of a shared encoder process (see serve.py --encoder-process);
+# when set, workers send out-of-vocabulary words there instead of loading the model
+ENCODER_ADDRESS = os.getenv("ENCODER_ADDRESS", "")
+ENCODER_AUTHKEY = os.getenv("ENCODER_AUTHKEY", "")
+
+# Directory of memory-mapped per-secret rankings shared by all workers
+# on the host (empty: every worker keeps its own in RAM)
+RANKING_SHARE_DIR = os.getenv("RANKING_SHARE_DIR", "")
+
+# Dedicated pool for CPU-bound scoring/encoding; requests beyond
+# COMPUTE_WORKERS + COMPUTE_MAX_QUEUE get a 503
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", 4))
+COMPUTE_MAX_QUEUE = int(os.getenv("COMPUTE_MAX_QUEUE", 64))
+
+# Hot-path timing spans and request latency histograms served at /metrics
+# (Prometheus text format); SERVER_TIMING=1 also returns each request's
+# spans in a Server-Timing header
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+# Enables /debug/profile (sampling cProfile, switched on at runtime) for
+# callers passing this token; empty disables the endpoint
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+
+# eager: warm up in a background task at startup (use /readyz as readiness probe)
+# lazy:  warm up on the first game request
+WARMUP_MODE = os.getenv("WARMUP_MODE", "eager")
+
+# In-memory storage of the vocabulary matrix: float32, float16, int8
+# (per-row scalar) or pq (FAISS product quantization, PQ_M bytes/word).
+# Compressed storage trades memory for slower ranking builds (about 2-3x
+# float32's scoring time, see benchmarks/bench_quantization.py)
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "float32")
+EMBEDDING_PQ_M = int(os.getenv("EMBEDDING_PQ_M", 48))
+EMBEDDING_PQ_NBITS = int(os.getenv("EMBEDDING_PQ_NBITS", 8))
@@ -0,0 +1,164 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+PERCENTILES = (50, 75, 90, 99)
+
+
+class DayStats:
+    """Counters for one day of daily-mode games; merging two is addition"""
+    __slots__ = ('games', 'wins', 'guesses_total', 'histogram')
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.guesses_total = 0
+        # guess count of a won game -> number of games
+        self.histogram: Dict[int, int] = {}
+
+    def add(self, other: 'DayStats'):
+        self.games += other.games
+        self.wins += other.wins
+        self.guesses_total += other.guesses_total
+        for guesses, count in other.histogram.items():
+            self.histogram[guesses] = self.histogram.get(guesses, 0) + count
+
+    @classmethod
+    def from_doc(cls, doc: Optional[Dict]) -> 'DayStats':
+        stats = cls()
+        if doc:
+            stats.games = doc.get('games', 0)
+            stats.wins = doc.get('wins', 0)
+            stats.guesses_total = doc.get('guesses_total', 0)
+            stats.histogram = {int(k): v for k, v in doc.get('histogram', {}).items()}
+        return stats
+
+    def percentile(self, q: float) -> Optional[int]:
+        """Guess count at percentile q of won games (walks the histogram)"""
+        if not self.wins:
+            return None
+        threshold = q / 100 * self.wins
+        seen = 0
+        for guesses in sorted(self.histogram):
+            seen += self.histogram[guesses]
+            if seen >= threshold:
+                return guesses
+        return max(self.histogram)
+
+    def summary(self, date_str: str) -> Dict:
+        return {
+            'date': date_str,
+            'total_games': self.games,
+            'completed_games': self.wins,
+            'win_rate': round(self.wins / self.games, 4) if self.games else 0.0,
+            'avg_guesses': round(self.guesses_total / self.wins, 2) if self.wins else None,
+            'percentiles': {f'p{q}': self.percentile(q) for q in PERCENTILES},
+            'histogram': {str(k): self.histogram[k] for k in sorted(self.histogram)}
+        }
+
+
+class DailyStats:
+    """
+    Daily-mode statistics kept incrementally as games start and finish.
+
+    `totals` has everything this process recorded for the last `keep_days`
+    days; `drain` hands over what was recorded since the previous call so
+    it can be added (with $inc) to the summary document every worker
+    shares.
+    """
+
+    def __init__(self, keep_days: int = 7):
+        self.keep_days = keep_days
+        self.totals: "OrderedDict[str, DayStats]" = OrderedDict()
+        self._pending: Dict[str, DayStats] = {}
+        self._lock = threading.Lock()
+
+    def _day(self, table, date_str: str) -> DayStats:
+        stats = table.get(date_str)
+        if stats is None:
+            stats = table[date_str] = DayStats()
+        return stats
+
+    def _record(self, date_str: str, won_with: Optional[int]):
+        with self._lock:
+            for table in (self.totals, self._pending):
+                stats = self._day(table, date_str)
+                if won_with is None:
+                    stats.games += 1
+                else:
+                    stats.wins += 1
+                    stats.guesses_total += won_with
+                    stats.histogram[won_with] = stats.histogram.get(won_with, 0) + 1
+            while len(self.totals) > self.keep_days:
+                self.totals.popitem(last=False)
+
+    def record_start(self, date_str: str):
+        self._record(date_str, None)
+
+    def record_win(self, date_str: str, guesses: int):
+        self._record(date_str, guesses)
+
+    def get(self, date_str: str) -> DayStats:
+        with self._lock:
+            stats = DayStats()
+            if date_str in self.totals:
+                stats.add(self.totals[date_str])
+            return stats
+
+    def pending(self, date_str: str) -> DayStats:
+        """Recorded here but not yet materialized"""
+        with self._lock:
+            stats = DayStats()
+            if date_str in self._pending:
+                stats.add(self._pending[date_str])
+            return stats
+
+    def drain(self) -> Dict[str, DayStats]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            return pending
+
+    def restore(self, pending: Dict[str, DayStats]):
+        """Put back deltas a failed materialization didn't write"""
+        with self._lock:
+            for date_str, stats in pending.items():
+                self._day(self._pending, date_str).add(stats)
+
+
+class StatsMaterializer:
+    """Background thread adding drained deltas to the shared summary documents"""
+
+    def __init__(self, stats: DailyStats, interval_seconds: float = 60):
+        self.stats = stats
+        self.interval = interval_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="daily-stats", daemon=True)
+        self._thread.start()
+        self.flushes = 0
+        self.failures = 0
+
+    def flush(self):
+        from database import increment_daily_stats
+
+        pending = self.stats.drain()
+        if not pending:
+            return
+        try:
+            for date_str in list(pending):
+                increment_daily_stats(date_str, pending[date_str])
+                # Written: must not be restored and $inc'd again next time
+                del pending[date_str]
+            self.flushes += 1
+        except Exception as e:
+            self.failures += 1
+            self.stats.restore(pending)
+            print(f"⚠️  Could not materialize daily stats for {len(pending)} days: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self.flush()
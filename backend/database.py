@@ -1,19 +1,17 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import MongoClient
+from pymongo import MongoClient, InsertOne, UpdateOne
 import os
 from dotenv import load_dotenv
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from pymongo.server_api import ServerApi
+from daily_stats import DayStats
 
 load_dotenv()
 
 MONGO_URL = os.getenv("MONGO_URL")
 DB_NAME = os.getenv("MONGO_DB_NAME", "contexto_game")
 
-if not MONGO_URL:
-    raise ValueError("MONGO_URL not found in environment variables!")
-
 connection_params = {
     "tls": True,
     "tlsAllowInvalidCertificates": True,
@@ -23,20 +21,36 @@ connection_params = {
     "server_api": ServerApi('1')
 }
 
-async_client = AsyncIOMotorClient(MONGO_URL, **connection_params)
-async_db = async_client[DB_NAME]
+# Clients are created on first use: the server boots from the local
+# vocabulary snapshot and only needs MongoDB for sessions and refreshes
+_async_client: Optional[AsyncIOMotorClient] = None
+_sync_client: Optional[MongoClient] = None
+
+def _require_mongo_url() -> str:
+    if not MONGO_URL:
+        raise ValueError("MONGO_URL not found in environment variables!")
+    return MONGO_URL
+
+def get_sync_db():
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = MongoClient(_require_mongo_url(), **connection_params)
+    return _sync_client[DB_NAME]
 
-sync_client = MongoClient(MONGO_URL, **connection_params)
-sync_db = sync_client[DB_NAME]
+def get_async_db():
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncIOMotorClient(_require_mongo_url(), **connection_params)
+    return _async_client[DB_NAME]
 
 def get_words_collection():
-    return sync_db["words"]
+    return get_sync_db()["words"]
 
 def get_sessions_collection():
-    return sync_db["game_sessions"]
+    return get_sync_db()["game_sessions"]
 
 async def get_sessions_collection_async():
-    return async_db["game_sessions"]
+    return get_async_db()["game_sessions"]
 
 # Game session 
 async def save_game_session(session_data: Dict):
@@ -63,6 +77,34 @@ async def add_guess_to_session(game_id: str, guess_data: Dict):
     )
     return result.modified_count > 0
 
+def session_change_operations(changes: Dict[str, Dict]) -> List:
+    """
+    Bulk operations for coalesced session changes (see session_backends):
+    new games are inserted with their first guesses, existing ones get a
+    single $push/$each for guesses and $set/$max/$addToSet for the rest,
+    so concurrent writers merge instead of overwriting each other.
+    """
+    from session_backends import apply_change
+
+    now = datetime.now().isoformat()
+    operations = []
+    for game_id, change in changes.items():
+        if change['create'] is not None:
+            doc = apply_change(None, change)
+            doc['updated_at'] = now
+            operations.append(InsertOne(doc))
+            continue
+
+        update = {"$set": {**change['set'], "updated_at": now}, "$inc": {"version": 1}}
+        if change['guesses']:
+            update["$push"] = {"guesses": {"$each": change['guesses']}}
+        if change['max']:
+            update["$max"] = change['max']
+        if change['add']:
+            update["$addToSet"] = {field: {"$each": values} for field, values in change['add'].items()}
+        operations.append(UpdateOne({"game_id": game_id}, update))
+    return operations
+
 async def get_game_session(game_id: str) -> Optional[Dict]:
     collection = await get_sessions_collection_async()
     session = await collection.find_one({"game_id": game_id})
@@ -70,42 +112,48 @@ async def get_game_session(game_id: str) -> Optional[Dict]:
         session.pop('_id', None) 
     return session
 
+def get_daily_stats_collection():
+    return get_sync_db()["daily_stats"]
+
+def increment_daily_stats(date_str: str, delta: DayStats):
+    """Add one worker's recorded deltas to the day's summary document"""
+    inc = {
+        "games": delta.games,
+        "wins": delta.wins,
+        "guesses_total": delta.guesses_total,
+        **{f"histogram.{guesses}": count for guesses, count in delta.histogram.items()}
+    }
+    get_daily_stats_collection().update_one(
+        {"_id": date_str},
+        {"$inc": inc, "$set": {"updated_at": datetime.now().isoformat()}},
+        upsert=True
+    )
+
+async def get_daily_stats_doc(date_str: str) -> Optional[Dict]:
+    collection = get_async_db()["daily_stats"]
+    return await collection.find_one({"_id": date_str})
+
 async def get_daily_stats(date_str: str) -> Dict:
-    collection = await get_sessions_collection_async()
-    
-    pipeline = [
-        {"$match": {"mode": "daily", "date": date_str}},
-        {"$group": {
-            "_id": None,
-            "total_games": {"$sum": 1},
-            "completed_games": {
-                "$sum": {"$cond": [{"$eq": ["$won", True]}, 1, 0]}
-            },
-            "avg_guesses": {
-                "$avg": {"$size": "$guesses"}
-            }
-        }}
-    ]
-    
-    result = await collection.aggregate(pipeline).to_list(1)
-    return result[0] if result else {}
+    """Materialized daily summary (one document read, no session scan)"""
+    return DayStats.from_doc(await get_daily_stats_doc(date_str)).summary(date_str)
 
-def load_reference_words() -> Tuple[List[str], None]:
+def load_reference_words() -> Tuple[List[str], List[int]]:
+    """Words and their frequency ranks, most frequent first (snapshot refresh only)"""
     collection = get_words_collection()
     collection.create_index([("frequency_rank", 1)])
 
     pipeline = [
         {"$sort": {"frequency_rank": 1}},
-        {"$project": {"_id": 0, "word": 1}}
+        {"$project": {"_id": 0, "word": 1, "frequency_rank": 1}}
     ]
     
     try:
         cursor = collection.aggregate(pipeline, allowDiskUse=True)
-        words = [doc['word'] for doc in cursor]
-        return words, None
+        docs = list(cursor)
+        return [doc['word'] for doc in docs], [doc['frequency_rank'] for doc in docs]
     except Exception as e:
         print(f"Error loading reference words: {e}")
-        return [], None
+        return [], []
 
 def initialize_word_list(words: List[str]):
     collection = get_words_collection()
@@ -1,24 +1,184 @@
 import random
+import threading
+import time
 import uuid
 from datetime import datetime, date
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
 import numpy as np
 from script.guess import GuessWord
 from script.layer_score import LayeredScoring
+from script.ranking import RankingCache, SecretRanking, SharedRankings
+from script.index import build_index
+from script.difficulty import load_tiers
+from script.variants import VariantIndex
+from script.secret_pool import SecretPool, SecretPoolArchive, archive_label, archive_path
+from script.quantization import VocabMatrix, as_vocab_matrix
+from session_store import GameSession, SessionStore
+from session_backends import make_session_backend
+from daily_stats import DailyStats
+from metrics import REGISTRY, span
+from config import (
+    MODEL_NAME,
+    DIFFICULTY_TIERS_PATH,
+    GUESS_VARIANTS,
+    GUESS_TYPOS,
+    RANKING_CACHE_SIZE,
+    RANKING_SHARE_DIR,
+    SECRET_POOL_DIR,
+    SECRET_POOL_WARM,
+    FAISS_INDEX_TYPE,
+    FAISS_HNSW_M,
+    FAISS_HNSW_EF_SEARCH,
+    FAISS_IVF_NLIST,
+    FAISS_IVF_NPROBE,
+    EMBEDDING_STORAGE,
+    EMBEDDING_PQ_M,
+    EMBEDDING_PQ_NBITS,
+    SESSION_TTL_SECONDS,
+    MAX_SESSIONS,
+    SESSION_BACKEND,
+    SESSION_SQLITE_PATH,
+    SESSION_FLUSH_MS,
+    SESSION_FLUSH_BATCH,
+    SESSION_MAX_PENDING
+)
+
+def build_shared_index(reference_embeddings: VocabMatrix):
+    """The process-wide FAISS index, configured from the environment"""
+    return build_index(
+        reference_embeddings,
+        index_type=FAISS_INDEX_TYPE,
+        hnsw_m=FAISS_HNSW_M,
+        hnsw_ef_search=FAISS_HNSW_EF_SEARCH,
+        ivf_nlist=FAISS_IVF_NLIST,
+        ivf_nprobe=FAISS_IVF_NPROBE,
+        storage=EMBEDDING_STORAGE,
+        pq_m=EMBEDDING_PQ_M,
+        pq_nbits=EMBEDDING_PQ_NBITS
+    )
+
+def build_session_store() -> SessionStore:
+    """Session store backed by the configured SESSION_BACKEND"""
+    return SessionStore(
+        ttl_seconds=SESSION_TTL_SECONDS,
+        max_sessions=MAX_SESSIONS,
+        backend=make_session_backend(SESSION_BACKEND, SESSION_SQLITE_PATH, SESSION_TTL_SECONDS),
+        flush_interval_ms=SESSION_FLUSH_MS,
+        max_batch=SESSION_FLUSH_BATCH,
+        max_pending=SESSION_MAX_PENDING
+    )
 
 class GameManager:
-    def __init__(self, reference_words: List[str], reference_embeddings: np.ndarray):
+    def __init__(
+        self,
+        reference_words: List[str],
+        reference_embeddings: Union[np.ndarray, VocabMatrix],
+        scorer: Optional[LayeredScoring] = None,
+        index=None,
+        sessions: Optional[SessionStore] = None
+    ):
+        reference_embeddings = as_vocab_matrix(reference_embeddings)
         self.reference_words = reference_words
         self.reference_embeddings = reference_embeddings
-        self.active_games = {}
-        self.scorer = LayeredScoring()
-        self.easy_words = reference_words[:1000]
-        self.medium_words = reference_words[1000:3000]
-        self.hard_words = reference_words[3000:]
+        # Cached row norms for per-word cosines; a ranking mapped from an archive
+        # never computes them, and the first guess shouldn't
+        reference_embeddings.norms
+        self.sessions = sessions if sessions is not None else build_session_store()
+        self.daily_stats = DailyStats()
+        self.scorer = scorer if scorer else LayeredScoring()
+        if self.scorer.vocab_words is not reference_words:
+            self.scorer.load_vocabulary(reference_words, reference_embeddings)
+        self.shared_rankings = SharedRankings(
+            RANKING_SHARE_DIR, reference_words, archive_label(MODEL_NAME, EMBEDDING_STORAGE)
+        ) if RANKING_SHARE_DIR else None
+        self.rankings = RankingCache(self._build_ranking, maxsize=RANKING_CACHE_SIZE)
+        # Built on first use: nothing on the request path searches it
+        self._index = index
+        self._index_lock = threading.Lock()
+        self.variants = VariantIndex(reference_words, self.scorer.vocab_index, typos=GUESS_TYPOS) if GUESS_VARIANTS else None
+        tiers = load_tiers(DIFFICULTY_TIERS_PATH, reference_words)
+        if tiers is not None:
+            print(f"✅ Difficulty tiers from {DIFFICULTY_TIERS_PATH}: " + ", ".join(f"{name} {len(words)}" for name, words in tiers.items()))
+            self.easy_words, self.medium_words, self.hard_words = tiers['easy'], tiers['medium'], tiers['hard']
+        else:
+            self.easy_words = reference_words[:1000]
+            self.medium_words = reference_words[1000:3000]
+            self.hard_words = reference_words[3000:]
+        self.difficulty_words = {'easy': self.easy_words, 'medium': self.medium_words, 'hard': self.hard_words}
+        self.secret_pool = self._build_secret_pool()
         self.daily_seed = None
         self.daily_word = None
         
+        self.register_metrics()
         print(f"✅ GameManager ready with {len(reference_words)} words")
+
+    def register_metrics(self):
+        """Scrape-time gauges/counters over the caches and session store"""
+        caches = {'embedding': self.scorer.embedding_cache, 'ranking': self.rankings}
+        REGISTRY.gauge(
+            "contexto_active_sessions", "Game sessions held by this worker",
+            fn=lambda: len(self.sessions)
+        )
+        REGISTRY.counter(
+            "contexto_cache_hits_total", "Cache lookups served from memory", ("cache",),
+            fn=lambda: {(name,): cache.hits for name, cache in caches.items()}
+        )
+        REGISTRY.counter(
+            "contexto_cache_misses_total", "Cache lookups that had to compute", ("cache",),
+            fn=lambda: {(name,): cache.misses for name, cache in caches.items()}
+        )
+        REGISTRY.gauge(
+            "contexto_secret_pool_ready", "Practice secrets with a ranking ready, per difficulty", ("difficulty",),
+            fn=lambda: {(difficulty,): self.secret_pool.ready(difficulty) for difficulty in self.difficulty_words}
+        )
+        REGISTRY.counter(
+            "contexto_guess_variants_total", "Out-of-vocabulary guesses checked for a vocabulary variant", ("outcome",),
+            fn=lambda: {
+                ('resolved',): self.variants.resolved if self.variants else 0,
+                ('unresolved',): self.variants.unresolved if self.variants else 0
+            }
+        )
+        REGISTRY.gauge(
+            "contexto_cache_entries", "Entries held per cache", ("cache",),
+            fn=lambda: {(name,): len(cache) for name, cache in caches.items()}
+        )
+
+    def _build_secret_pool(self) -> SecretPool:
+        label = archive_label(MODEL_NAME, EMBEDDING_STORAGE)
+        archives = {}
+        for difficulty in self.difficulty_words:
+            archive = SecretPoolArchive.open(archive_path(SECRET_POOL_DIR, difficulty), self.reference_words, label)
+            if archive is not None:
+                archives[difficulty] = archive
+                print(f"✅ {len(archive)} precomputed {difficulty} secrets mapped from {archive.path}")
+        return SecretPool(self.difficulty_words, self._build_ranking, archives, warm=SECRET_POOL_WARM)
+
+    def _build_ranking(self, secret_word: str) -> SecretRanking:
+        ranking = self.secret_pool.archived(secret_word)
+        if ranking is not None:
+            return ranking
+
+        if self.shared_rankings:
+            ranking = self.shared_rankings.load(secret_word)
+            if ranking is not None:
+                return ranking
+
+        with span("ranking_build"):
+            ranking = SecretRanking.build(
+                secret_word,
+                self.reference_words,
+                self.reference_embeddings,
+                self.scorer
+            )
+
+        if self.shared_rankings:
+            try:
+                self.shared_rankings.store(ranking)
+                # Use the mapped copy so this worker shares the pages too
+                ranking = self.shared_rankings.load(secret_word) or ranking
+            except OSError as e:
+                print(f"⚠️  Could not share ranking for a secret word: {e}")
+        return ranking
     
     def get_daily_word(self) -> str:
         """Get consistent daily word for all players"""
@@ -26,53 +186,60 @@ class GameManager:
         seed = int(today.strftime('%Y%m%d'))
         
         if seed != self.daily_seed:
-            random.seed(seed)
-            self.daily_word = random.choice(self.medium_words)  # Daily = medium difficulty
+            # Own generator: other threads drawing from the global one between a
+            # seed() and a choice() would give this worker a different word
+            self.daily_word = random.Random(seed).choice(self.medium_words)  # Daily = medium difficulty
             self.daily_seed = seed
             print(f"📅 Daily word updated: {len(self.daily_word)} letters")
         
         return self.daily_word
     
-    def start_new_game(self, mode: str = 'practice', difficulty: str = 'medium') -> Dict:
+    def pick_secret(self, mode: str = 'practice', difficulty: str = 'medium') -> str:
+        if mode == 'daily':
+            return self.get_daily_word()
+
+        if not self.difficulty_words.get(difficulty):
+            # Unknown difficulty, or a tier a small vocabulary leaves empty
+            difficulty = 'medium' if self.medium_words else next(
+                name for name, words in self.difficulty_words.items() if words
+            )
+
+        # A secret whose ranking is already built or mapped: the new game is instant
+        ready = self.secret_pool.take(difficulty)
+        if ready is not None:
+            secret_word, ranking = ready
+            self.rankings.put(secret_word, ranking)
+            return secret_word
+
+        return random.choice(self.difficulty_words[difficulty])
+
+    def start_new_game(
+        self,
+        mode: str = 'practice',
+        difficulty: str = 'medium',
+        secret_word: Optional[str] = None
+    ) -> Dict:
         """
         mode: 'daily' or 'practice'
         difficulty: 'easy', 'medium', 'hard' (only for practice)
+        secret_word: already picked with pick_secret (picked here if None)
         """
         game_id = str(uuid.uuid4())
 
+        if secret_word is None:
+            secret_word = self.pick_secret(mode, difficulty)
+
         if mode == 'daily':
-            secret_word = self.get_daily_word()
             message = "Today's daily challenge!"
         else:
-
-            if difficulty == 'easy':
-                word_pool = self.easy_words
-            elif difficulty == 'hard':
-                word_pool = self.hard_words
-            else:
-                word_pool = self.medium_words
-            
-            secret_word = random.choice(word_pool)
             message = f"Practice mode - {difficulty} difficulty"
         
-      
-        game = GuessWord(
-            reference_words=self.reference_words,
-            secret_word=secret_word,
-            reference_embeddings=self.reference_embeddings,
-            scorer=self.scorer 
-        )
-        
-        # Store game session
-        self.active_games[game_id] = {
-            'game': game,
-            'mode': mode,
-            'difficulty': difficulty,
-            'started_at': datetime.now(),
-            'completed_at': None,
-            'guesses': [],
-            'won': False
-        }
+        # Build (or reuse) the ranking now so the first guess is cheap
+        self.rankings.get(secret_word)
+        session = GameSession(game_id, self.scorer.vocab_index[secret_word], mode, difficulty)
+        self.sessions.add(session)
+        if mode == 'daily':
+            self.daily_stats.record_start(session.date)
         
         return {
             'game_id': game_id,
@@ -80,53 +247,135 @@ class GameManager:
             'hint': f'The word has {len(secret_word)} letters',
             'mode': mode
         }
+
+    @property
+    def index(self):
+        """The process-wide FAISS index, built the first time it's asked for"""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = build_shared_index(self.reference_embeddings)
+        return self._index
+
+    def secret_of(self, session: GameSession) -> str:
+        return self.reference_words[session.secret_index]
+
+    def _game_for(self, session: GameSession, cached_only: bool = False) -> Optional[GuessWord]:
+        """
+        Rebuild the game from the shared ranking (cheap when it's cached).
+        With cached_only=True, None instead of building a missing ranking.
+        """
+        secret_word = self.secret_of(session)
+        # One lookup: a ranking evicted after a membership check would be rebuilt inline
+        ranking = self.rankings.peek(secret_word) if cached_only else self.rankings.get(secret_word)
+        if ranking is None:
+            return None
+        with span("guess_word_init"):
+            return GuessWord(
+                reference_words=self.reference_words,
+                secret_word=secret_word,
+                reference_embeddings=self.reference_embeddings,
+                scorer=self.scorer,
+                ranking=ranking,
+                index_provider=lambda: self.index,
+                variants=self.variants
+            )
     
-    def make_guess(self, game_id: str, word: str) -> Dict:
-        """Make a guess in an existing game"""
-        if game_id not in self.active_games:
+    def make_guess(self, game_id: str, word: str, cached_only: bool = False) -> Optional[Dict]:
+        """
+        Make a guess in an existing game. With cached_only=True, returns
+        None when the guess would need the transformer, a ranking rebuild
+        or a session load from the shared backend.
+        """
+        session = self.sessions.get(game_id, load=not cached_only)
+        if session is None:
+            if cached_only and self.sessions.shared:
+                return None
             return {'error': 'Game not found. Start a new game!'}
         
-        game_session = self.active_games[game_id]
-        
-        if game_session['won']:
+        if session.won:
             return {
                 'error': 'Game already completed!',
-                'total_guesses': len(game_session['guesses'])
+                'total_guesses': len(session.guesses)
             }
-        
+
+        game = self._game_for(session, cached_only=cached_only)
+        if game is None:
+            return None
+
         # Make the guess
-        result = game_session['game'].guess(word)
+        result = game.guess(word, allow_model=not cached_only)
+        if result is None or result.get('error'):
+            return result
         
         # Track guess
-        game_session['guesses'].append({
-            'word': word,
-            'rank': result['rank'],
-            'score': result['score'],
-            'timestamp': datetime.now().isoformat()
-        })
+        guess = (word, result['rank'], result['score'], time.time())
+        session.seen_words.add(result['word'])
+        if result.get('resolved_to'):
+            # No hint for the word this guess already scored as
+            session.seen_words.add(result['resolved_to'])
+        session.guesses.append(guess)
         
         # Check if won
         if result['rank'] == 0:
-            game_session['won'] = True
-            game_session['completed_at'] = datetime.now()
-            result['total_guesses'] = len(game_session['guesses'])
-        
+            session.won = True
+            session.completed_at = time.time()
+            result['total_guesses'] = len(session.guesses)
+            if session.mode == 'daily':
+                self.daily_stats.record_win(session.date, len(session.guesses))
+
+        self.sessions.save(session, guess)
         return result
     
+    def get_hint(self, game_id: str, cached_only: bool = False) -> Optional[Dict]:
+        """
+        Next closest word the player hasn't seen yet. None if the game is
+        not found, or with cached_only=True when the ranking must be rebuilt.
+        """
+        session = self.sessions.get(game_id, load=not cached_only)
+        if session is None:
+            return None
+        game = self._game_for(session, cached_only=cached_only)
+        if game is None:
+            return None
+
+        hint, session.hint_cursor = game.next_hint(
+            session.hint_cursor,
+            session.seen_words
+        )
+
+        if hint is None:
+            return {'error': 'No more hints available'}
+
+        session.seen_words.add(hint['word'])
+        self.sessions.save(session)
+        return hint
+
+    def reveal(self, game_id: str) -> Optional[str]:
+        session = self.sessions.get(game_id)
+        return self.secret_of(session) if session else None
+
     def get_game_stats(self, game_id: str) -> Dict:
         """Get statistics for a game"""
-        if game_id not in self.active_games:
+        session = self.sessions.get(game_id)
+        if session is None:
             return {'error': 'Game not found'}
         
-        session = self.active_games[game_id]
-        
         return {
             'game_id': game_id,
-            'mode': session['mode'],
-            'difficulty': session.get('difficulty', 'N/A'),
-            'total_guesses': len(session['guesses']),
-            'started_at': session['started_at'].isoformat(),
-            'completed_at': session['completed_at'].isoformat() if session['completed_at'] else None,
-            'won': session['won'],
-            'guess_history': session['guesses']
-        }
\ No newline at end of file
+            'mode': session.mode,
+            'difficulty': session.difficulty,
+            'total_guesses': len(session.guesses),
+            'started_at': datetime.fromtimestamp(session.started_at).isoformat(),
+            'completed_at': datetime.fromtimestamp(session.completed_at).isoformat() if session.completed_at else None,
+            'won': session.won,
+            'guess_history': [
+                {
+                    'word': word,
+                    'rank': rank,
+                    'score': score,
+                    'timestamp': datetime.fromtimestamp(timestamp).isoformat()
+                }
+                for word, rank, score, timestamp in session.guesses
+            ]
+        }
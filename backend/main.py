@@ -1,23 +1,51 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
 import threading
 from game_manager import GameManager
-from script.guess import GuessWord
-from database import load_reference_words
+from compute import ComputeBusy, ComputePool
+from warmup import Warmup, build_game_manager
+from daily_stats import DayStats, StatsMaterializer
+from metrics import REGISTRY, MetricsMiddleware, profiler
+from script.quantization import VocabMatrix
+from config import (
+    COMPUTE_WORKERS,
+    COMPUTE_MAX_QUEUE,
+    WARMUP_MODE,
+    DAILY_STATS_FLUSH_SECONDS,
+    SERVER_TIMING,
+    PROFILE_TOKEN
+)
+from datetime import date
 import os
 class AppState:
     def __init__(self):
         self.game_manager: Optional[GameManager] = None
         self.word_list: List[str] = []
+        self.word_embeddings: Optional[VocabMatrix] = None
         self._initialized = False
         self._lock = threading.Lock()
+        self.compute = ComputePool(max_workers=COMPUTE_WORKERS, max_queue=COMPUTE_MAX_QUEUE)
+        self.warmup = Warmup()
+        self.warmup_task: Optional[asyncio.Task] = None
+        self.stats_materializer: Optional[StatsMaterializer] = None
 
 app_state = AppState()
 
+REGISTRY.gauge(
+    "contexto_compute_in_flight", "Calls running or queued on the compute pool",
+    fn=lambda: app_state.compute.in_flight
+)
+REGISTRY.counter(
+    "contexto_compute_rejected_total", "Compute calls rejected with a 503",
+    fn=lambda: app_state.compute.rejected
+)
+
 def lazy_init():
-    """Load embeddings only once, on first request (solves OOM on Vercel)"""
+    """Load the vocabulary, model and indexes once (background task or first request)"""
     if app_state._initialized:
         return
 
@@ -25,31 +53,78 @@ def lazy_init():
         if app_state._initialized:
             return
 
-        print("First request! Loading 30k+ word embeddings from MongoDB... (this takes ~10s, one-time only)")
-        word_list, word_embeddings = load_reference_words()
-        print(f"Successfully loaded {len(word_list)} words")
+        print("Warming up: loading words, embeddings, model and WordNet tables...")
+        app_state.warmup = Warmup()
+        try:
+            game_manager = build_game_manager(app_state.warmup)
+        except Exception as e:
+            app_state.warmup.fail(e)
+            print(f"❌ Warmup failed: {e}")
+            raise
 
-        app_state.word_list = [str(w) for w in word_list]
-        app_state.game_manager = GameManager(
-            reference_words=app_state.word_list,
-            reference_embeddings=word_embeddings
-        )
+        app_state.word_list = game_manager.reference_words
+        app_state.word_embeddings = game_manager.reference_embeddings
+        app_state.game_manager = game_manager
+        game_manager.secret_pool.start()
+        if DAILY_STATS_FLUSH_SECONDS > 0 and os.getenv("MONGO_URL"):
+            app_state.stats_materializer = StatsMaterializer(game_manager.daily_stats, DAILY_STATS_FLUSH_SECONDS)
         app_state._initialized = True
         print("Game engine HOT and ready! All future requests = instant")
 
+def background_warmup():
+    try:
+        lazy_init()
+    except Exception:
+        # Already recorded on app_state.warmup and reported by /readyz;
+        # the next game request retries through lazy_init
+        pass
+
+async def ensure_initialized():
+    """Run lazy_init off the event loop so cheap endpoints keep answering"""
+    if not app_state._initialized:
+        await asyncio.to_thread(lazy_init)
+
+async def refresh_session(game_id: str):
+    """Pick up changes other workers made to a shared session (no-op in memory)"""
+    if app_state.game_manager.sessions.shared:
+        await asyncio.to_thread(app_state.game_manager.sessions.refresh, game_id)
+
+async def run_compute(fn, *args, **kwargs):
+    try:
+        return await app_state.compute.run(profiler.call, fn, *args, **kwargs)
+    except ComputeBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many players thinking at once... try again in a moment",
+            headers={"Retry-After": "1"}
+        )
+
 app = FastAPI(
     title="Contexto Unlimited API",
     description="Contexto with unlimited hints ",
     version="1.0.0",
 )
 
-# @app.on_event("startup")
-# async def startup_event():
-#     """Initialize on server startup instead of first request"""
-#     print("🚀 Server starting - initializing game engine...")
-#     lazy_init()
-#     print("✅ Game engine ready!")
+@app.on_event("startup")
+async def startup_event():
+    """In eager mode, warm up in the background while /healthz already answers"""
+    if WARMUP_MODE == "eager":
+        print("🚀 Server starting - warming up game engine in the background...")
+        app_state.warmup_task = asyncio.create_task(asyncio.to_thread(background_warmup))
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """Stop worker threads, flush pending sessions and stats, persist the OOV embedding cache"""
+    app_state.compute.shutdown()
+    if app_state.stats_materializer:
+        app_state.stats_materializer.close()
+    if app_state.game_manager:
+        app_state.game_manager.secret_pool.close()
+        app_state.game_manager.sessions.close()
+        app_state.game_manager.scorer.encoder.close()
+        app_state.game_manager.scorer.embedding_cache.save()
+
+app.add_middleware(MetricsMiddleware, server_timing=SERVER_TIMING)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -78,27 +153,83 @@ class GuessResponse(BaseModel):
     total_guesses: Optional[int] = None
 
 @app.get("/")
-def root():
+async def root():
     return {
         "message": "Contexto Unlimited API — Pink & Yellow Edition",
         "status": "ready" if app_state._initialized else "warming up...",
-        "active_games": len(app_state.game_manager.active_games) if app_state.game_manager else 0
+        "active_games": len(app_state.game_manager.sessions) if app_state.game_manager else 0,
+        "sessions": app_state.game_manager.sessions.stats() if app_state.game_manager else None,
+        "secret_pool": app_state.game_manager.secret_pool.stats() if app_state.game_manager else None,
+        "compute": app_state.compute.stats()
     }
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving HTTP"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: only 200 once the game engine is fully warmed up"""
+    report = app_state.warmup.report()
+    report["ready"] = app_state._initialized
+    return JSONResponse(status_code=200 if app_state._initialized else 503, content=report)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text format: hot-path spans, request latency, caches, sessions"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+def check_profile_token(token: str):
+    if not PROFILE_TOKEN or token != PROFILE_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+
+@app.get("/debug/profile")
+async def profile_report(token: str = "", sort: str = "cumulative", limit: int = 40):
+    """Accumulated cProfile report of the sampled game calls"""
+    check_profile_token(token)
+    try:
+        report = profiler.report(sort=sort, limit=limit)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown sort key '{sort}'")
+    header = f"sample rate {profiler.rate}, {profiler.sampled} calls profiled\n\n"
+    return PlainTextResponse(header + report)
+
+@app.post("/debug/profile")
+async def configure_profile(token: str = "", rate: float = 0.0, reset: bool = False):
+    """Profile this fraction of game calls from now on (0 switches it off)"""
+    check_profile_token(token)
+    profiler.configure(rate, reset=reset)
+    return profiler.stats()
+
 @app.post("/game/new")
-def new_game(mode: str = "practice", difficulty: str = "medium"):
-    lazy_init()
-    if not app_state.game_manager:
+async def new_game(mode: str = "practice", difficulty: str = "medium"):
+    await ensure_initialized()
+    game_manager = app_state.game_manager
+    if not game_manager:
         raise HTTPException(status_code=503, detail="Waking up the summer brain... try again in 10s")
-    return app_state.game_manager.start_new_game(mode=mode, difficulty=difficulty)
+
+    secret_word = game_manager.pick_secret(mode=mode, difficulty=difficulty)
+    # A single rankings.get on a compute worker: instant when the ranking is
+    # cached or came from the secret pool, and if it was evicted meanwhile
+    # the rebuild still happens off the event loop
+    return await run_compute(
+        game_manager.start_new_game, mode=mode, difficulty=difficulty, secret_word=secret_word
+    )
 
 @app.post("/game/guess")
-def make_guess(request: GuessRequest):
-    lazy_init()
-    if not app_state.game_manager:
+async def make_guess(request: GuessRequest):
+    await ensure_initialized()
+    game_manager = app_state.game_manager
+    if not game_manager:
         raise HTTPException(status_code=503, detail="Still loading embeddings... hold tight!")
     
-    result = app_state.game_manager.make_guess(request.game_id, request.word)
+    await refresh_session(request.game_id)
+
+    # Vocabulary and cached words are answered inline, new words need the model
+    result = profiler.call(game_manager.make_guess, request.game_id, request.word, cached_only=True)
+    if result is None:
+        result = await run_compute(game_manager.make_guess, request.game_id, request.word)
     
     if result.get("error"):
         return GuessResponse(
@@ -114,52 +245,71 @@ def make_guess(request: GuessRequest):
     return result
 
 @app.get("/hint")
-def get_one_hint(game_id: str):
-    lazy_init()
-    if not app_state.game_manager:
+async def get_one_hint(game_id: str):
+    await ensure_initialized()
+    game_manager = app_state.game_manager
+    if not game_manager:
         raise HTTPException(status_code=503, detail="Loading hints engine...")
     
-    if game_id not in app_state.game_manager.active_games:
+    await refresh_session(game_id)
+    if game_id not in game_manager.sessions:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    game_session = app_state.game_manager.active_games[game_id]
-    game: GuessWord = game_session["game"]
-
-    if "hints_given" not in game_session:
-        game_session["hints_given"] = []
-
-    secret = game.secret_word.lower()
-    candidates = game.find_similar_words(secret, top_k=20)
-
-    available = [
-        c for c in candidates
-        if c["word"].lower() != secret and c["word"] not in game_session["hints_given"]
-    ]
-
-    if not available:
-        raise HTTPException(status_code=400, detail="No more hints available")
+    # Rebuilding an evicted ranking is CPU work, keep it off the event loop
+    hint = profiler.call(game_manager.get_hint, game_id, cached_only=True)
+    if hint is None:
+        hint = await run_compute(game_manager.get_hint, game_id)
+    if hint is None:
+        raise HTTPException(status_code=404, detail="Game not found")
 
-    best = available[0]
-    game_session["hints_given"].append(best["word"])
+    if hint.get("error"):
+        raise HTTPException(status_code=400, detail=hint["error"])
 
     return {
-        "word": best["word"],
-        "similarity": round(best["similarity"], 4),
-        "percent": int(best["similarity"] * 100)
+        "word": hint["word"],
+        "similarity": round(hint["similarity"], 4),
+        "percent": int(hint["similarity"] * 100),
+        "rank": hint["rank"]
     }
 
 @app.get("/reveal")
-def reveal_secret(game_id: str):
-    lazy_init()
+async def reveal_secret(game_id: str):
+    await ensure_initialized()
     if not app_state.game_manager:
         raise HTTPException(status_code=503, detail="Loading secret word...")
     
-    if game_id not in app_state.game_manager.active_games:
+    await refresh_session(game_id)
+    secret = app_state.game_manager.reveal(game_id) if game_id in app_state.game_manager.sessions else None
+    if secret is None:
         raise HTTPException(status_code=404, detail="Game not found or already ended")
     
-    secret = app_state.game_manager.active_games[game_id]["game"].secret_word
     return {"secret": secret}
 
+@app.get("/stats/daily")
+async def daily_stats(day: Optional[str] = None):
+    """
+    Daily-mode games, wins and guess-count distribution. The shared summary
+    document plus what this worker hasn't materialized yet, or this
+    worker's own counters when there's no MongoDB.
+    """
+    await ensure_initialized()
+    if not app_state.game_manager:
+        raise HTTPException(status_code=503, detail="Counting today's players...")
+
+    date_str = day or date.today().isoformat()
+    stats = app_state.game_manager.daily_stats
+    summary = None
+    if app_state.stats_materializer:
+        from database import get_daily_stats_doc
+        try:
+            summary = DayStats.from_doc(await get_daily_stats_doc(date_str))
+            summary.add(stats.pending(date_str))
+        except Exception as e:
+            print(f"⚠️  Daily stats summary unavailable, using this worker's counters: {e}")
+    if summary is None:
+        summary = stats.get(date_str)
+    return summary.summary(date_str)
+
 if __name__ == "__main__":
     import uvicorn
     import os
@@ -0,0 +1,331 @@
+import cProfile
+import io
+import math
+import pstats
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+from config import METRICS_ENABLED
+
+# Latency buckets in seconds: 10µs (vocabulary guess layers) up to 10s
+# (ranking rebuild on a cold model)
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), fn: Optional[Callable] = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        # Function-backed metrics read an existing counter/size at scrape
+        # time: a number, or {label values tuple: number}
+        self.fn = fn
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def _samples(self) -> Dict[Tuple, float]:
+        if self.fn is None:
+            with self._lock:
+                return dict(self._values)
+        value = self.fn()
+        return value if isinstance(value, dict) else {(): value}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self._samples().items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram (Prometheus semantics) per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labelvalues):
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> Dict[Tuple, Dict]:
+        with self._lock:
+            return {
+                labels: {'counts': list(counts), 'sum': total, 'count': count}
+                for labels, (counts, total, count) in self._series.items()
+            }
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in self.snapshot().items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series['counts']):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series['count']}")
+        return lines
+
+
+class Registry:
+    """Named metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        # Re-registering a name replaces it (e.g. a new GameManager's gauges)
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = (), fn: Optional[Callable] = None) -> Counter:
+        return self.register(Counter(name, help, labelnames, fn))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = (), fn: Optional[Callable] = None) -> Gauge:
+        return self.register(Gauge(name, help, labelnames, fn))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # A broken gauge function shouldn't take the whole scrape down
+                print(f"⚠️  Metric {metric.name} failed to render: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+SPAN_SECONDS = REGISTRY.histogram(
+    "contexto_span_seconds",
+    "Time spent in instrumented hot-path sections",
+    ("span",)
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "contexto_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status")
+)
+ENCODER_BATCH_SIZE = REGISTRY.histogram(
+    "contexto_encoder_batch_size",
+    "Words per batched transformer forward pass",
+    buckets=BATCH_SIZE_BUCKETS
+)
+
+# Span durations of the current request, for the Server-Timing header
+_request_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_timings", default=None)
+
+
+class span:
+    """
+    Times a block into contexto_span_seconds{span=name} and, while a
+    request is collecting Server-Timing, into that request's totals.
+    Usable as a context manager or a decorator.
+    """
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if METRICS_ENABLED:
+            record(self.name, time.perf_counter() - self.start)
+        return False
+
+    def __call__(self, fn: Callable) -> Callable:
+        name = self.name
+
+        def timed(*args, **kwargs):
+            if not METRICS_ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+
+        timed.__name__ = fn.__name__
+        timed.__qualname__ = fn.__qualname__
+        timed.__doc__ = fn.__doc__
+        timed.__wrapped__ = fn
+        return timed
+
+
+def record(name: str, seconds: float):
+    SPAN_SECONDS.observe(seconds, name)
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.get(name)
+        if entry is None:
+            timings[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+
+def server_timing_header(timings: Dict[str, List[float]], total_seconds: float) -> str:
+    parts = [
+        f'{name};dur={seconds * 1000:.3f};desc="{count}x"' if count > 1 else f"{name};dur={seconds * 1000:.3f}"
+        for name, (seconds, count) in timings.items()
+    ]
+    parts.append(f"total;dur={total_seconds * 1000:.3f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route and, with
+    server_timing=True, returning the request's spans in a Server-Timing
+    header. Spans recorded on compute threads count too: ComputePool runs
+    work in the request's context.
+    """
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings: Dict[str, List[float]] = {}
+        token = _request_timings.set(timings) if self.server_timing else None
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if self.server_timing:
+                    header = server_timing_header(timings, time.perf_counter() - start)
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                _request_timings.reset(token)
+            route = scope.get("route")
+            # Unmatched paths share one label so scanners can't blow up cardinality
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status[0]
+            )
+
+
+class SamplingProfiler:
+    """
+    cProfile over a random sample of game calls, switched on at runtime.
+    Profiles accumulate into one pstats report; only one call is profiled
+    at a time and the rest run untouched.
+    """
+
+    def __init__(self):
+        self.rate = 0.0
+        self.sampled = 0
+        self._stats: Optional[pstats.Stats] = None
+        self._busy = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def configure(self, rate: float, reset: bool = False):
+        self.rate = min(max(rate, 0.0), 1.0)
+        if reset:
+            with self._stats_lock:
+                self._stats = None
+                self.sampled = 0
+
+    def call(self, fn: Callable, *args, **kwargs):
+        if not self.rate or random.random() >= self.rate or not self._busy.acquire(blocking=False):
+            return fn(*args, **kwargs)
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(fn, *args, **kwargs)
+        finally:
+            self._busy.release()
+            with self._stats_lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profile)
+                else:
+                    self._stats.add(profile)
+                self.sampled += 1
+
+    def report(self, sort: str = "cumulative", limit: int = 40) -> str:
+        with self._stats_lock:
+            if self._stats is None:
+                return "No samples yet\n"
+            out = io.StringIO()
+            self._stats.stream = out
+            self._stats.sort_stats(sort).print_stats(limit)
+            return out.getvalue()
+
+    def stats(self) -> Dict:
+        return {'rate': self.rate, 'sampled': self.sampled}
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,20 @@
+from sentence_transformers import SentenceTransformer
+from config import SNAPSHOT_PATH, MODEL_NAME
+from database import load_reference_words
+from script.embeddings import build_embedding_matrix
+from script.snapshot import write_snapshot
+
+def build_snapshot():
+    """Refresh the local vocabulary snapshot from MongoDB"""
+    words, frequency_ranks = load_reference_words()
+    if not words:
+        print("❌ No words in MongoDB, run setup_words.py first")
+        return
+
+    print(f"Encoding {len(words)} words with {MODEL_NAME}...")
+    model = SentenceTransformer(MODEL_NAME)
+    matrix = build_embedding_matrix(words, model)
+    write_snapshot(SNAPSHOT_PATH, words, matrix, MODEL_NAME, frequency_ranks)
+
+if __name__ == "__main__":
+    build_snapshot()
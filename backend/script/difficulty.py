@@ -0,0 +1,189 @@
+"""
+Difficulty tiers from the vocabulary's geometry instead of frequency
+slices. For every word, streams blocks of the cosine matrix (never the
+full N x N) to get its nearest-neighbour similarities, then combines:
+
+    gap        similarity of the closest word minus the 100th closest
+               (a secret whose neighbours stand out is easier to home in on)
+    density    mean similarity of the 10 closest words (isolated = harder)
+    ambiguity  WordNet senses (more senses = guesses pull in more directions)
+    rarity     frequency rank
+
+into a hardness percentile and cuts it at quantiles into easy / medium /
+hard. GameManager uses the tiers file when it matches the vocabulary.
+
+    cd backend
+    python -m script.difficulty
+    python -m script.difficulty --memory-mb 512 --quantiles 0.2 0.6
+"""
+import argparse
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from script.ranking import vocabulary_fingerprint
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# Weight of each feature's hardness percentile in the combined score
+FEATURE_WEIGHTS = {'gap': 1.0, 'density': 1.0, 'ambiguity': 1.0, 'rarity': 1.0}
+DENSITY_K = 10
+GAP_K = 100
+
+
+def neighbour_features(
+    matrix: np.ndarray,
+    density_k: int = DENSITY_K,
+    gap_k: int = GAP_K,
+    memory_mb: int = 256
+) -> Dict[str, np.ndarray]:
+    """
+    Nearest-neighbour features of every row of a normalized matrix.
+    Rows go through in blocks sized so one block of similarities
+    (rows x N float32) fits in `memory_mb`.
+    """
+    n = len(matrix)
+    k = min(max(density_k, gap_k), n - 1)
+    block_rows = max(1, min(n, (memory_mb << 20) // (n * 4)))
+    gap = np.empty(n, dtype=np.float32)
+    density = np.empty(n, dtype=np.float32)
+
+    start = time.perf_counter()
+    for lo in range(0, n, block_rows):
+        hi = min(n, lo + block_rows)
+        sims = np.asarray(matrix[lo:hi], dtype=np.float32) @ np.asarray(matrix, dtype=np.float32).T
+        # Negated in place so the k smallest are the k nearest; a word is not its own neighbour
+        np.negative(sims, out=sims)
+        sims[np.arange(hi - lo), np.arange(lo, hi)] = np.inf
+        sims.partition(k - 1, axis=1)
+        top = -np.sort(sims[:, :k], axis=1)
+        del sims
+        gap[lo:hi] = top[:, 0] - top[:, min(gap_k, k) - 1]
+        density[lo:hi] = top[:, :min(density_k, k)].mean(axis=1)
+        if (lo // block_rows) % 10 == 9:
+            print(f"   {hi}/{n} words ({time.perf_counter() - start:.0f}s)")
+
+    return {'gap': gap, 'density': density}
+
+
+def wordnet_ambiguity(words: List[str]) -> np.ndarray:
+    """log(1 + number of WordNet synsets), zeros if WordNet isn't available"""
+    from script.layer_score import wordnet
+
+    try:
+        corpus = wordnet()
+        corpus.ensure_loaded()
+    except Exception as e:
+        print(f"⚠️  WordNet unavailable ({type(e).__name__}), ambiguity left out")
+        return np.zeros(len(words), dtype=np.float32)
+    return np.fromiter(
+        (math.log1p(len(corpus.synsets(word.replace(" ", "_")))) for word in words),
+        dtype=np.float32,
+        count=len(words)
+    )
+
+
+def percentile_rank(values: np.ndarray) -> np.ndarray:
+    """0 for the smallest value, 1 for the largest (ties share the average)"""
+    order = np.argsort(values, kind='stable')
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.arange(len(values))
+    # Average the ranks of tied values so the tie order doesn't matter
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    sums = np.bincount(inverse, weights=ranks)
+    return (sums / counts)[inverse] / max(len(values) - 1, 1)
+
+
+def hardness(features: Dict[str, np.ndarray], weights: Dict[str, float] = FEATURE_WEIGHTS) -> np.ndarray:
+    """Weighted mean of per-feature hardness percentiles (0 easiest, 1 hardest)"""
+    harder_when_larger = {
+        'gap': -features['gap'],
+        'density': -features['density'],
+        'ambiguity': features['ambiguity'],
+        'rarity': features['rarity']
+    }
+    # Constant features (e.g. no WordNet) carry no information
+    used = {name: w for name, w in weights.items() if w and np.ptp(harder_when_larger[name]) > 0}
+    if not used:
+        return np.zeros(len(features['gap']))
+    total = sum(used.values())
+    return sum(w * percentile_rank(harder_when_larger[name]) for name, w in used.items()) / total
+
+
+def assign_tiers(scores: np.ndarray, quantiles: Sequence[float]) -> Dict[str, np.ndarray]:
+    """Vocabulary indices per tier, cut at the given hardness quantiles"""
+    cuts = np.quantile(scores, quantiles)
+    tier_of = np.searchsorted(cuts, scores, side='right')
+    return {name: np.flatnonzero(tier_of == i).astype(np.int32) for i, name in enumerate(DIFFICULTIES)}
+
+
+def write_tiers(path: str, words: List[str], tiers: Dict[str, np.ndarray], quantiles: Sequence[float], model_name: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "model": model_name,
+            "count": len(words),
+            "fingerprint": vocabulary_fingerprint(words).hex(),
+            "quantiles": list(quantiles),
+            # Indices in frequency order, like the old slices
+            "tiers": {name: sorted(int(i) for i in indices) for name, indices in tiers.items()}
+        }, f)
+    os.replace(tmp_path, path)
+    print(f"✅ Wrote difficulty tiers to {path}: " + ", ".join(f"{name} {len(indices)}" for name, indices in tiers.items()))
+
+
+def load_tiers(path: str, words: List[str]) -> Optional[Dict[str, List[str]]]:
+    """Words per tier from a tiers file built for this vocabulary, else None"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if data["count"] != len(words) or data["fingerprint"] != vocabulary_fingerprint(words).hex():
+            print(f"⚠️  Difficulty tiers at {path} were built for another vocabulary, ignoring them")
+            return None
+        tiers = {name: [words[i] for i in data["tiers"][name]] for name in DIFFICULTIES}
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        print(f"⚠️  Ignoring difficulty tiers at {path}: {e}")
+        return None
+    if not all(tiers.values()):
+        print(f"⚠️  Difficulty tiers at {path} have an empty tier, ignoring them")
+        return None
+    return tiers
+
+
+def main():
+    from config import DIFFICULTY_TIERS_PATH, SNAPSHOT_PATH
+    from script.snapshot import read_snapshot
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH)
+    parser.add_argument("--out", default=DIFFICULTY_TIERS_PATH)
+    parser.add_argument("--memory-mb", type=int, default=256, help="Budget for one block of similarities")
+    parser.add_argument("--quantiles", type=float, nargs=2, default=[1 / 3, 2 / 3],
+                        help="Hardness cut points between easy/medium and medium/hard")
+    args = parser.parse_args()
+
+    snapshot = read_snapshot(args.snapshot)
+    words = snapshot.words
+    print(f"Difficulty features for {len(words)} words ({snapshot.embeddings.shape[1]}d)...")
+
+    start = time.perf_counter()
+    features = neighbour_features(snapshot.embeddings, memory_mb=args.memory_mb)
+    print(f"⏱️  Neighbour features took {time.perf_counter() - start:.0f}s")
+    features['ambiguity'] = wordnet_ambiguity(words)
+    features['rarity'] = np.asarray(snapshot.frequency_ranks, dtype=np.float32)
+
+    scores = hardness(features)
+    tiers = assign_tiers(scores, args.quantiles)
+    for name, indices in tiers.items():
+        summary = ", ".join(f"{feature} {features[feature][indices].mean():.3f}" for feature in ('gap', 'density', 'ambiguity'))
+        print(f"   {name}: {len(indices)} words, mean {summary}")
+    write_tiers(args.out, words, tiers, args.quantiles, snapshot.model)
+
+
+if __name__ == "__main__":
+    main()
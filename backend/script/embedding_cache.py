@@ -0,0 +1,135 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from script.embeddings import words_path_for
+
+
+def normalize_word(word: str) -> str:
+    return word.strip().lower()
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU of single-word embeddings keyed by normalized word.
+
+    Vocabulary words are seeded from the shared matrix (row views, never
+    evicted); everything else lives in a bounded LRU that can be saved to
+    a memory-mapped .npy file so a restarted server starts warm.
+    """
+
+    def __init__(self, maxsize: int = 5000, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.path = path
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._vocab_index: Dict[str, int] = {}
+        self._vocab_matrix = None
+        self.hits = 0
+        self.misses = 0
+
+        if path:
+            self.load(path)
+
+    def seed(self, vocab_index: Dict[str, int], matrix):
+        """Serve every vocabulary word straight from the shared matrix"""
+        self._vocab_index = vocab_index
+        self._vocab_matrix = matrix
+
+    def get(self, word: str) -> Optional[np.ndarray]:
+        key = normalize_word(word)
+
+        idx = self._vocab_index.get(key)
+        if idx is not None and self._vocab_matrix is not None:
+            with self._lock:
+                self.hits += 1
+            return self._vocab_matrix[idx]
+
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def __contains__(self, word: str) -> bool:
+        """Membership check that doesn't touch LRU order or counters"""
+        key = normalize_word(word)
+        return key in self._vocab_index or key in self._entries
+
+    def put(self, word: str, vector: np.ndarray):
+        key = normalize_word(word)
+        vector = np.array(vector, dtype=np.float32)
+        vector.flags.writeable = False
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def load(self, path: str):
+        """Warm the LRU from a previous save (rows stay memory-mapped)"""
+        words_path = words_path_for(path)
+        if not os.path.exists(path) or not os.path.exists(words_path):
+            return
+
+        try:
+            matrix = np.load(path, mmap_mode="r")
+            with open(words_path, encoding="utf-8") as f:
+                words = f.read().split("\n")
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load embedding cache from {path}: {e}")
+            return
+
+        if len(words) != len(matrix):
+            print(f"⚠️  Embedding cache at {path} is inconsistent, ignoring it")
+            return
+
+        with self._lock:
+            for word, row in zip(words[-self.maxsize:], matrix[-self.maxsize:]):
+                self._entries[word] = row
+        print(f"✅ Embedding cache warmed with {len(self._entries)} words from {path}")
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        if not path:
+            return
+
+        with self._lock:
+            words: List[str] = list(self._entries.keys())
+            vectors = list(self._entries.values())
+        if not vectors:
+            return
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npy"
+        out = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(len(vectors), len(vectors[0]))
+        )
+        for i, vector in enumerate(vectors):
+            out[i] = vector
+        out.flush()
+        del out
+
+        with open(words_path_for(path) + ".tmp", "w", encoding="utf-8") as f:
+            f.write("\n".join(words))
+        os.replace(tmp_path, path)
+        os.replace(words_path_for(path) + ".tmp", words_path_for(path))
+        print(f"✅ Saved {len(words)} cached embeddings to {path}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'vocabulary': len(self._vocab_index),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
@@ -0,0 +1,37 @@
+import os
+import numpy as np
+from typing import List
+
+
+def words_path_for(matrix_path: str) -> str:
+    """Word list stored next to a saved matrix so rows can be checked for alignment"""
+    return os.path.splitext(matrix_path)[0] + ".words.txt"
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place (cosine similarity becomes a dot product)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def as_shared_matrix(matrix: np.ndarray) -> np.ndarray:
+    """
+    Return the matrix as read-only, C-contiguous float32 without copying
+    when it already has that layout. Every game shares this one array.
+    """
+    shared = np.ascontiguousarray(matrix, dtype=np.float32)
+    shared.flags.writeable = False
+    return shared
+
+
+def build_embedding_matrix(words: List[str], model, batch_size: int = 256) -> np.ndarray:
+    """Encode the whole vocabulary once into a normalized float32 matrix"""
+    matrix = model.encode(
+        words,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=True
+    ).astype(np.float32, copy=False)
+    return as_shared_matrix(normalize_rows(matrix))
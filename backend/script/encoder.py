@@ -0,0 +1,106 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+import numpy as np
+from metrics import ENCODER_BATCH_SIZE, span
+
+_STOP = object()
+
+
+class BatchingEncoder:
+    """
+    Micro-batching front for SentenceTransformer.encode.
+
+    Callers submit single words from any thread; one background thread
+    collects whatever arrives within `max_wait_ms` (up to `max_batch_size`
+    words), runs a single batched forward pass and resolves each caller's
+    future. Duplicate words in the same batch are encoded once.
+    """
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="batching-encoder", daemon=True)
+                    self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, text: str, timeout: float = 30.0) -> np.ndarray:
+        return self.submit(text).result(timeout=timeout)
+
+    def _collect(self, first) -> Tuple[List, bool]:
+        """Gather a batch starting with `first`; also report if close() was called"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _encode_batch(self, batch: List):
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        ENCODER_BATCH_SIZE.observe(len(texts))
+        try:
+            with span("encoder_batch"):
+                vectors = self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        by_text = dict(zip(texts, vectors))
+        for text, future in batch:
+            future.set_result(by_text[text])
+
+        self.batches += 1
+        self.items += len(batch)
+        self.max_seen_batch = max(self.max_seen_batch, len(batch))
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stopping = self._collect(first)
+            self._encode_batch(batch)
+            if stopping:
+                return
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'max_batch_size': self.max_seen_batch,
+            'pending': self._queue.qsize()
+        }
@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+from typing import Callable, List
+import numpy as np
+
+ENCODER_BACKENDS = ('torch', 'onnx')
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model_int8.onnx"
+ONNX_CONFIG_FILE = "encoder_config.json"
+
+
+class OnnxSentenceEncoder:
+    """
+    The sentence transformer exported to ONNX (see script.export_onnx):
+    `tokenizers` for the word pieces, ONNX Runtime for the transformer and
+    the same attention-masked mean pooling, with no torch import.
+    """
+
+    def __init__(self, model_dir: str, int8: bool = False, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, ONNX_CONFIG_FILE)) as f:
+            config = json.load(f)
+        self.max_length = config.get("max_seq_length", 128)
+        self.do_lower_case = config.get("do_lower_case", False)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_length)
+        pad_token = config.get("pad_token", "[PAD]")
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token)
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        model_file = ONNX_INT8_MODEL_FILE if int8 else ONNX_MODEL_FILE
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        print(f"✅ ONNX encoder loaded from {model_dir} ({model_file})")
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        if self.do_lower_case:
+            texts = [t.lower() for t in texts]
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean over real tokens only, like sentence-transformers' Pooling
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        vectors = np.concatenate([
+            self._encode_batch(texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ]).astype(np.float32, copy=False)
+        return vectors[0] if single else vectors
+
+
+def load_local_model(backend: str, model_name: str, onnx_dir: str, int8: bool = False):
+    """Model running in this process: sentence-transformers (torch) or ONNX Runtime"""
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}', expected one of {ENCODER_BACKENDS}")
+    if backend == 'onnx':
+        return OnnxSentenceEncoder(onnx_dir, int8=int8)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+class LazyModel:
+    """
+    Loads the model on the first encode() (or an explicit load()), so a
+    worker that only ever sees cached or vocabulary words never imports
+    torch or onnxruntime.
+    """
+
+    def __init__(self, loader: Callable):
+        self._loader = loader
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._loader()
+        return self._model
+
+    def encode(self, sentences, **kwargs) -> np.ndarray:
+        return self.load().encode(sentences, **kwargs)
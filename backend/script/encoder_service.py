@@ -0,0 +1,74 @@
+import os
+import threading
+from multiprocessing.connection import Client, Listener
+from typing import Callable, List
+import numpy as np
+from script.encoder import BatchingEncoder
+
+
+def serve_encoder(address: str, authkey: bytes, load_model: Callable, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+    """
+    Run one model for every worker on the host. Each worker connection
+    gets a thread; their requests go through a shared BatchingEncoder, so
+    concurrent words from different workers still share a forward pass.
+    """
+    model = load_model()
+    encoder = BatchingEncoder(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    if os.path.exists(address):
+        os.remove(address)
+    listener = Listener(address, family='AF_UNIX', authkey=authkey)
+    print(f"✅ Encoder service listening on {address}")
+
+    def handle(conn):
+        with conn:
+            while True:
+                try:
+                    texts = conn.recv()
+                except EOFError:
+                    return
+                try:
+                    futures = [encoder.submit(text) for text in texts]
+                    conn.send(np.stack([f.result() for f in futures]))
+                except Exception as e:
+                    conn.send(e)
+
+    try:
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=handle, args=(conn,), name="encoder-conn", daemon=True).start()
+    finally:
+        listener.close()
+        encoder.close()
+
+
+class RemoteModel:
+    """
+    Stand-in for SentenceTransformer that forwards encode() to the
+    encoder service, so worker processes never load the model.
+    """
+
+    def __init__(self, address: str, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = Client(self.address, family='AF_UNIX', authkey=self.authkey)
+        return conn
+
+    def encode(self, sentences: List[str], batch_size: int = 32, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        conn = self._connection()
+        try:
+            conn.send([sentences] if single else list(sentences))
+            result = conn.recv()
+        except (EOFError, OSError):
+            # Service restarted: reconnect on the next call
+            self._local.conn = None
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result[0] if single else result
@@ -0,0 +1,131 @@
+"""
+Export the sentence transformer to ONNX for ENCODER_BACKEND=onnx, then
+check the ONNX output against the torch model on a sample of words.
+
+    cd backend
+    python -m script.export_onnx --int8
+    python -m script.export_onnx --check-only --int8 --min-cosine 0.99
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List
+import numpy as np
+from config import MODEL_NAME, ONNX_MODEL_DIR, SNAPSHOT_PATH
+from script.encoder_backends import (
+    ONNX_CONFIG_FILE,
+    ONNX_INT8_MODEL_FILE,
+    ONNX_MODEL_FILE,
+    OnnxSentenceEncoder
+)
+from script.snapshot import load_snapshot
+
+SAMPLE_WORDS = [
+    "apple", "river", "happiness", "run", "quickly", "blue", "democracy", "guitar",
+    "ice cream", "running", "mice", "the", "photosynthesis", "zzqx", "café", "New York"
+]
+
+
+def export(model, out_dir: str, int8: bool, opset: int = 14):
+    import torch
+
+    os.makedirs(out_dir, exist_ok=True)
+    transformer = model[0]
+    auto_model = transformer.auto_model.eval()
+    tokenizer = model.tokenizer
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "tokens"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "tokens"}
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *inputs):
+            return self.inner(**dict(zip(input_names, inputs)))[0]
+
+    model_path = os.path.join(out_dir, ONNX_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(auto_model),
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset
+        )
+    print(f"✅ Exported {MODEL_NAME} to {model_path}")
+
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, ONNX_CONFIG_FILE), "w") as f:
+        json.dump({
+            "model": MODEL_NAME,
+            "max_seq_length": model.max_seq_length,
+            "do_lower_case": getattr(transformer, "do_lower_case", False),
+            "pad_token": tokenizer.pad_token
+        }, f, indent=2)
+
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        int8_path = os.path.join(out_dir, ONNX_INT8_MODEL_FILE)
+        quantize_dynamic(model_path, int8_path, weight_type=QuantType.QInt8)
+        print(f"✅ Dynamically quantized (int8) model written to {int8_path}")
+
+
+def check(model, out_dir: str, words: List[str], int8: bool, min_cosine: float) -> bool:
+    """Cosine between torch and ONNX embeddings of the same words"""
+    expected = model.encode(words, convert_to_numpy=True)
+    actual = OnnxSentenceEncoder(out_dir, int8=int8).encode(words)
+
+    expected = expected / np.linalg.norm(expected, axis=1, keepdims=True)
+    actual = actual / np.linalg.norm(actual, axis=1, keepdims=True)
+    cosines = np.einsum("ij,ij->i", expected, actual)
+    worst = int(np.argmin(cosines))
+
+    label = "int8" if int8 else "fp32"
+    print(f"{label}: {len(words)} words, mean cosine {cosines.mean():.6f}, "
+          f"min {cosines[worst]:.6f} ('{words[worst]}'), max abs diff {np.abs(expected - actual).max():.2e}")
+    if cosines[worst] < min_cosine:
+        print(f"❌ ONNX {label} output is outside tolerance (min cosine {min_cosine})")
+        return False
+    print(f"✅ ONNX {label} output matches torch within tolerance")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=ONNX_MODEL_DIR)
+    parser.add_argument("--int8", action="store_true", help="Also write (and check) a dynamically quantized model")
+    parser.add_argument("--check-only", action="store_true")
+    parser.add_argument("--sample", type=int, default=500, help="Vocabulary words to compare on, besides the fixed list")
+    parser.add_argument("--min-cosine", type=float, default=None,
+                        help="Lowest acceptable cosine per word (default 0.9999 fp32, 0.99 int8)")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(MODEL_NAME)
+
+    if not args.check_only:
+        export(model, args.out, args.int8)
+
+    words = list(SAMPLE_WORDS)
+    snapshot = load_snapshot(SNAPSHOT_PATH)
+    if snapshot is not None and args.sample:
+        rng = np.random.default_rng(0)
+        picks = rng.choice(len(snapshot.words), size=min(args.sample, len(snapshot.words)), replace=False)
+        words += [snapshot.words[i] for i in picks]
+
+    ok = check(model, args.out, words, False, args.min_cosine or 0.9999)
+    if args.int8:
+        ok = check(model, args.out, words, True, args.min_cosine or 0.99) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,25 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Set, Tuple, Union
 from script.layer_score import LayeredScoring
-import faiss
+from script.embeddings import build_embedding_matrix
+from script.quantization import VocabMatrix, as_vocab_matrix
+from script.ranking import SecretRanking
+from script.index import build_index
+from script.variants import VariantIndex
+from metrics import span
 
 class GuessWord:
     def __init__(
         self,
         reference_words: List[str],
         secret_word: str,
-        reference_embeddings: Optional[np.ndarray] = None,
+        reference_embeddings: Optional[Union[np.ndarray, VocabMatrix]] = None,
         scorer: Optional[LayeredScoring] = None,
-        use_cosine: bool = True
+        use_cosine: bool = True,
+        ranking: Optional[SecretRanking] = None,
+        index=None,
+        variants: Optional[VariantIndex] = None,
+        index_provider: Optional[Callable] = None
     ):
         self.reference_words = reference_words
         self.secret_word = secret_word.lower()
@@ -19,50 +27,52 @@ class GuessWord:
         self.use_cosine = use_cosine
 
         if reference_embeddings is not None:
-            print("Using pre-computed embeddings")
-            self.reference_embeddings = reference_embeddings.astype('float32')
+            # Shared, already normalized matrix: no per-game copy
+            self.reference_embeddings = as_vocab_matrix(reference_embeddings)
         else:
             print("Computing embeddings...")
-            self.reference_embeddings = self.scorer.model.encode(
-                reference_words,
-                convert_to_numpy=True,
-                show_progress_bar=True
-            ).astype('float32')
+            self.reference_embeddings = as_vocab_matrix(
+                build_embedding_matrix(reference_words, self.scorer.model)
+            )
 
-        if self.use_cosine:
-            faiss.normalize_L2(self.reference_embeddings)
-
-        # Secret word embedding
-        self.secret_emb = self.scorer.model.encode([self.secret_word])[0].astype('float32')
-        if self.use_cosine:
-            self.secret_emb /= np.linalg.norm(self.secret_emb)
-
-        # Pre-calculate reference scores for ranking
-        print("Pre-calculating scores for ranking... (this may take a moment)")
-        self.reference_scores = np.array([
-            self.scorer.calculate_score(
-                word,
+        # Per-secret ranking is immutable and usually comes from the shared cache
+        if ranking is None:
+            ranking = SecretRanking.build(
                 self.secret_word,
-                guess_emb=ref_emb,
-                secret_emb=self.secret_emb
-            )['score']
-            for word, ref_emb in zip(self.reference_words, self.reference_embeddings)
-        ])
-        print("Score pre-calculation complete.")
-        self.sorted_indices = np.argsort(-self.reference_scores)
-        self.sorted_scores = self.reference_scores[self.sorted_indices]
-        
-        print(f"✅ Initialized game with secret word '{self.secret_word}'")
+                self.reference_words,
+                self.reference_embeddings,
+                self.scorer
+            )
+        self.ranking = ranking
+        self.secret_emb = ranking.secret_emb
+        self.reference_scores = ranking.scores
+        self.sorted_indices = ranking.sorted_indices
+        self.sorted_scores = ranking.sorted_scores
+        self._index = index
+        self._index_provider = index_provider
+        self.variants = variants
 
-        dimension = self.reference_embeddings.shape[1]
-        if self.use_cosine:
-            self.index = faiss.IndexFlatIP(dimension)
+        # word -> vocabulary row, shared with the scorer when it's the same vocabulary
+        if self.scorer.vocab_words is reference_words:
+            self.word_index = self.scorer.vocab_index
         else:
-            self.index = faiss.IndexFlatL2(dimension)
-        self.index.add(self.reference_embeddings)
-        print(f"✅ FAISS index built with {len(reference_words)} vectors")
+            self.word_index = {w: i for i, w in enumerate(reference_words)}
 
-    def guess(self, word: str) -> Dict:
+    @property
+    def index(self):
+        """Shared FAISS index (from `index_provider` if given); standalone games build their own on first use"""
+        if self._index is None:
+            if self._index_provider is not None:
+                self._index = self._index_provider()
+            else:
+                self._index = build_index(self.reference_embeddings, use_cosine=self.use_cosine)
+        return self._index
+
+    def guess(self, word: str, allow_model: bool = True) -> Optional[Dict]:
+        """
+        Score a guess. With allow_model=False, returns None instead of
+        running the transformer (caller should retry on a compute worker).
+        """
         word = word.lower().strip()
 
         if not word:
@@ -95,24 +105,49 @@ class GuessWord:
             'won': True
             }
     
-        try:
-            score_data = self.scorer.calculate_score(
-                word, 
-                self.secret_word,
-                secret_emb=self.secret_emb
-                )
+        word_idx = self.word_index.get(word)
+        in_reference = word_idx is not None
+        resolved_to = resolved_by = None
+        if word_idx is None and self.variants is not None:
+            # Inflection or typo of a vocabulary word: score that word instead
+            match = self.variants.resolve(word, exclude=self.word_index.get(self.secret_word))
+            if match is not None:
+                word_idx, resolved_by = match
+                resolved_to = self.reference_words[word_idx]
+
+        if word_idx is not None:
+            # Vocabulary word: exact precomputed score and rank, no model call
+            scored_word = resolved_to or word
+            score_data = self.scorer.explain_score(
+                word,
+                self.reference_embeddings.cosine_at(word_idx, self.secret_emb),
+                self.scorer.lexical_similarity(scored_word, self.secret_word),
+                self.scorer.category_match(scored_word, self.secret_word),
+                score=float(self.reference_scores[word_idx])
+            )
             guess_score = score_data['score']
-        except Exception as e:
-            return {
-            'error': True,
-            'message': f'Unable to process word "{word}". Try another word.',
-            'word': word
-            }
-    
-   
-        rank = np.searchsorted(-self.sorted_scores, -guess_score) + 1
-    
-        in_reference = word in self.reference_words
+            rank = self.ranking.rank_of(word_idx) + 1
+        else:
+            if not allow_model and word not in self.scorer.embedding_cache:
+                return None
+
+            try:
+                score_data = self.scorer.calculate_score(
+                    word, 
+                    self.secret_word,
+                    secret_emb=self.secret_emb
+                    )
+                guess_score = score_data['score']
+            except Exception as e:
+                return {
+                'error': True,
+                'message': f'Unable to process word "{word}". Try another word.',
+                'word': word
+                }
+
+            with span("searchsorted"):
+                # Compare in the ranking's dtype (archived rankings are float32) so ties land alike
+                rank = np.searchsorted(-self.sorted_scores, -self.sorted_scores.dtype.type(guess_score)) + 1
     
         return {
         'word': word,
@@ -123,16 +158,16 @@ class GuessWord:
         'explanations': score_data.get('explanations', []),
         'message': score_data['message'],
         'won': False,
-        'in_reference': in_reference
+        'in_reference': in_reference,
+        'resolved_to': resolved_to,
+        'resolved_by': resolved_by
         }
 
     def find_similar_words(self, word: str, top_k: int = 10) -> List[Dict]:
-        word_emb = self.scorer.model.encode([word])[0].astype('float32')
-        if self.use_cosine:
-            word_emb /= np.linalg.norm(word_emb)
-        word_emb = np.expand_dims(word_emb, axis=0)
+        word_emb = np.expand_dims(self.scorer.encode(word), axis=0)
 
-        distances, indices = self.index.search(word_emb, top_k)
+        with span("faiss_search"):
+            distances, indices = self.index.search(word_emb, top_k)
         results = []
         for dist, idx in zip(distances[0], indices[0]):
             if self.use_cosine:
@@ -146,3 +181,26 @@ class GuessWord:
                     "distance": float(dist)
                 })
         return results
+
+    def next_hint(self, cursor: int, exclude: Set[str]) -> Tuple[Optional[Dict], int]:
+        """
+        Walk the precomputed ranking from `cursor` and return the closest
+        word that isn't the secret or already seen, plus the new cursor.
+        No model call or index search: just the sorted vocabulary.
+        """
+        while cursor < len(self.sorted_indices):
+            idx = int(self.sorted_indices[cursor])
+            cursor += 1
+            word = self.reference_words[idx]
+            if word.lower() == self.secret_word or word in exclude:
+                continue
+
+            # Same cosine the ranking was built from (int8/pq rows aren't unit length)
+            similarity = self.reference_embeddings.cosine_at(idx, self.secret_emb)
+            return {
+                'word': word,
+                'similarity': similarity,
+                'rank': cursor
+            }, cursor
+
+        return None, cursor
@@ -0,0 +1,74 @@
+import numpy as np
+from typing import Union
+from script.quantization import Float16Matrix, PQMatrix, VocabMatrix, as_vocab_matrix
+
+INDEX_TYPES = ('flat', 'hnsw', 'ivf')
+
+
+def _flat_index(dimension: int, metric: int, storage: str, pq_m: int, pq_nbits: int):
+    """Flat index whose codes match the vocabulary storage type"""
+    import faiss
+
+    if storage == 'float16':
+        return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, metric)
+    if storage == 'int8':
+        return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, metric)
+    if storage == 'pq':
+        return faiss.IndexPQ(dimension, pq_m, pq_nbits, metric)
+    return faiss.IndexFlat(dimension, metric)
+
+
+def build_index(
+    embeddings: Union[np.ndarray, VocabMatrix],
+    index_type: str = 'flat',
+    use_cosine: bool = True,
+    hnsw_m: int = 32,
+    hnsw_ef_search: int = 64,
+    ivf_nlist: int = 100,
+    ivf_nprobe: int = 8,
+    storage: str = 'float32',
+    pq_m: int = 48,
+    pq_nbits: int = 8
+):
+    """
+    Build one FAISS index over the vocabulary matrix.
+    - flat: exact search (default, ~15MB for 10k x 384); with a compressed
+            `storage` the codes are fp16 / 8-bit scalar / PQ instead
+    - hnsw: graph-based, fast approximate search
+    - ivf:  inverted lists, cheaper to build, tune nprobe for recall
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS index type '{index_type}', expected one of {INDEX_TYPES}")
+
+    embeddings = as_vocab_matrix(embeddings)
+    if index_type == 'flat' and use_cosine and isinstance(embeddings, (Float16Matrix, PQMatrix)):
+        # fp16 and PQ storage are already searchable inner-product indexes
+        print(f"✅ FAISS flat index ({embeddings.storage}) shared with vocabulary storage, {embeddings.index.ntotal} vectors")
+        return embeddings.index
+
+    import faiss
+
+    dimension = embeddings.shape[1]
+    metric = faiss.METRIC_INNER_PRODUCT if use_cosine else faiss.METRIC_L2
+    # Training sample for quantizers / IVF centroids
+    sample = np.ascontiguousarray(embeddings.rows(0, min(len(embeddings), 100_000)))
+
+    if index_type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dimension, hnsw_m, metric)
+        index.hnsw.efSearch = hnsw_ef_search
+    elif index_type == 'ivf':
+        # FAISS wants roughly 39+ training points per list
+        nlist = max(1, min(ivf_nlist, len(embeddings) // 39))
+        quantizer = faiss.IndexFlatIP(dimension) if use_cosine else faiss.IndexFlatL2(dimension)
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist, metric)
+        index.nprobe = min(ivf_nprobe, nlist)
+    else:
+        index = _flat_index(dimension, metric, storage, pq_m, pq_nbits)
+
+    if not index.is_trained:
+        index.train(sample)
+    del sample
+    for _, block in embeddings.iter_blocks():
+        index.add(np.ascontiguousarray(block))
+    print(f"✅ FAISS {index_type} index ({storage}) built with {index.ntotal} vectors")
+    return index
@@ -1,27 +1,131 @@
-from sentence_transformers import SentenceTransformer
 from rapidfuzz.distance.Levenshtein import distance as levenshtein_distance
-from nltk.corpus import wordnet as wn
+from rapidfuzz.distance import Levenshtein
+from rapidfuzz import process
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
+from config import (
+    MODEL_NAME,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_PATH,
+    ENCODER_MAX_BATCH_SIZE,
+    ENCODER_MAX_WAIT_MS,
+    ENCODER_ADDRESS,
+    ENCODER_AUTHKEY,
+    ENCODER_BACKEND,
+    ONNX_MODEL_DIR,
+    ONNX_INT8
+)
+from script.embedding_cache import EmbeddingCache, normalize_word
+from script.encoder import BatchingEncoder
+from script.encoder_service import RemoteModel
+from script.encoder_backends import LazyModel, load_local_model
+from script.quantization import VocabMatrix, as_vocab_matrix
+from metrics import span
+
+# WordNet POS tags packed into a 5-bit mask
+POS_BITS = {'n': 1, 'v': 2, 'a': 4, 's': 8, 'r': 16}
+POPCOUNT = np.array([bin(i).count('1') for i in range(32)], dtype=np.uint8)
+
+# Importing nltk pulls in scipy and takes seconds, so WordNet is loaded on
+# first use (the warmup's POS table build) rather than at import
+wn = None
+
+def wordnet():
+    global wn
+    if wn is None:
+        from nltk.corpus import wordnet as corpus
+        wn = corpus
+    return wn
+
+@lru_cache(maxsize=50_000)
+def wordnet_pos_mask(word: str) -> int:
+    """POS bitmask of a word's synsets (0 if WordNet doesn't know it)"""
+    try:
+        mask = 0
+        for synset in wordnet().synsets(word):
+            mask |= POS_BITS.get(synset.pos(), 0)
+        return mask
+    except Exception:
+        return 0
+
+def pos_overlap(mask1: int, mask2: int) -> float:
+    """Fraction of shared POS tags, 0.5 when either word is unknown"""
+    if not mask1 or not mask2:
+        return 0.5
+    return round((mask1 & mask2).bit_count() / (mask1 | mask2).bit_count(), 2)
+
+def load_model():
+    """
+    Client of the host's shared encoder service if there is one, otherwise
+    the model in this process (ENCODER_BACKEND: torch or onnx)
+    """
+    if ENCODER_ADDRESS:
+        return RemoteModel(ENCODER_ADDRESS, ENCODER_AUTHKEY.encode())
+    return load_local_model(ENCODER_BACKEND, MODEL_NAME, ONNX_MODEL_DIR, int8=ONNX_INT8)
 
 class LayeredScoring:
+    SEMANTIC_WEIGHT = 0.7
+    LEXICAL_WEIGHT = 0.2
+    CATEGORY_WEIGHT = 0.1
+
     def __init__(self):
-        self.model = SentenceTransformer('paraphrase-MiniLM-L3-v2')
+        # Loaded on first use (or by warmup with MODEL_LOAD=eager)
+        self.model = LazyModel(load_model)
         # self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.vocab_words: List[str] = []
+        self.vocab_index: Dict[str, int] = {}
+        self.vocab_pos_masks = np.zeros(0, dtype=np.uint8)
+        # Concurrent single-word encodes share one batched forward pass
+        self.encoder = BatchingEncoder(
+            self.model,
+            max_batch_size=ENCODER_MAX_BATCH_SIZE,
+            max_wait_ms=ENCODER_MAX_WAIT_MS
+        )
+        self.embedding_cache = EmbeddingCache(
+            maxsize=EMBEDDING_CACHE_SIZE,
+            path=EMBEDDING_CACHE_PATH or None
+        )
+
+    def load_vocabulary(self, words: List[str], embeddings: Optional[VocabMatrix] = None):
+        """Precompute per-word lookup tables for the game vocabulary (warmup)"""
+        self.vocab_words = words
+        self.vocab_index = {word: i for i, word in enumerate(words)}
+        if embeddings is not None:
+            self.embedding_cache.seed(self.vocab_index, embeddings)
+        self.vocab_pos_masks = np.fromiter(
+            (wordnet_pos_mask(word) for word in words),
+            dtype=np.uint8,
+            count=len(words)
+        )
+        print(f"✅ WordNet POS table built for {len(words)} words")
         
+    def encode(self, word) -> np.ndarray:
+        """
+        Normalized float32 embedding of a single word. The transformer
+        only runs for strings the cache (vocabulary + LRU) hasn't seen.
+        """
+        vector = self.embedding_cache.get(word)
+        if vector is None:
+            with span("encode"):
+                vector = self.encoder.encode(normalize_word(word)).astype(np.float32)
+            vector /= np.linalg.norm(vector) or 1.0
+            self.embedding_cache.put(word, vector)
+        return vector
+
+    @span("semantic")
     def semantic_similarity(self, word1, word2, emb1=None, emb2=None):
         if emb1 is None:
-            emb1 = self.model.encode([word1])[0]
+            emb1 = self.encode(word1)
         if emb2 is None:
-            emb2 = self.model.encode([word2])[0]
-        
-        similarity = cosine_similarity(
-            emb1.reshape(1, -1),
-            emb2.reshape(1, -1)
-        )[0][0]
+            emb2 = self.encode(word2)
         
-        return float(similarity)
+        norms = np.linalg.norm(emb1) * np.linalg.norm(emb2)
+        if not norms:
+            return 0.0
+        return float(np.dot(emb1, emb2) / norms)
     
+    @span("lexical")
     def lexical_similarity(self, word1, word2):
         max_len = max(len(word1), len(word2))
         if max_len == 0:
@@ -32,25 +136,38 @@ class LayeredScoring:
         
         return max(0.0, normalized)
     
+    def pos_mask(self, word) -> int:
+        idx = self.vocab_index.get(word)
+        if idx is not None:
+            return int(self.vocab_pos_masks[idx])
+        return wordnet_pos_mask(word)
+
+    def pos_masks_for(self, words: List[str]) -> np.ndarray:
+        if words is self.vocab_words:
+            return self.vocab_pos_masks
+        return np.fromiter(map(self.pos_mask, words), dtype=np.uint8, count=len(words))
+
+    @span("category")
     def category_match(self, word1, word2):
         """Layer 3: WordNet category consistency (returns float 0-1)"""
-        try:
-            synsets1 = wn.synsets(word1)
-            synsets2 = wn.synsets(word2)
+        return pos_overlap(self.pos_mask(word1), self.pos_mask(word2))
 
-            if not synsets1 or not synsets2:
-                return 0.5  
+    def category_scores(self, pos_masks: np.ndarray, secret_mask: int) -> np.ndarray:
+        """Vectorized category_match: popcount ratio over a whole mask array"""
+        shared = POPCOUNT[pos_masks & secret_mask]
+        union = POPCOUNT[pos_masks | secret_mask]
+        overlap = shared / np.maximum(union, 1)
+        unknown = (pos_masks == 0) | (secret_mask == 0)
+        return np.where(unknown, 0.5, overlap).round(2)
 
-            pos1 = [s.pos() for s in synsets1]
-            pos2 = [s.pos() for s in synsets2]
-
-            # Fraction of POS overlap
-            overlap = len(set(pos1) & set(pos2)) / max(len(set(pos1 + pos2)), 1)
-            return round(float(overlap), 2)  # returns 0.0 to 1.0
+    def combine(self, semantic, lexical, category):
+        """Weighted combination, works on floats and NumPy arrays alike"""
+        return (
+            semantic * self.SEMANTIC_WEIGHT +
+            lexical * self.LEXICAL_WEIGHT +
+            category * self.CATEGORY_WEIGHT
+        )
 
-        except Exception:
-            return 0.5
-    
     def calculate_score(self, guess_word, secret_word, guess_emb=None, secret_emb=None):
         """
         Weights:
@@ -63,18 +180,18 @@ class LayeredScoring:
         lexical = self.lexical_similarity(guess_word, secret_word)
         category = self.category_match(guess_word, secret_word)
         
-        # Weighted combination
-        final_score = (
-            semantic * 0.7 +
-            lexical * 0.2 +
-            category * 0.1
-        )
-        
+        return self.explain_score(guess_word, semantic, lexical, category)
+
+    def explain_score(self, guess_word, semantic, lexical, category, score=None):
+        """Build the score payload from layer values (score can be precomputed)"""
+        if score is None:
+            # Weighted combination
+            score = self.combine(semantic, lexical, category)
 
         message = self.generate_message(semantic, lexical, category)
         explanations = self.generate_detailed_reasoning(semantic, lexical, category,guess_word)
         return {
-            'score': round(final_score, 4),
+            'score': round(score, 4),
             'reasoning': {
                 'semantic': round(semantic, 2),
                 'lexical': round(lexical, 2),
@@ -84,6 +201,56 @@ class LayeredScoring:
             'message': message
         }
     
+    def calculate_scores_batch(
+        self,
+        words: List[str],
+        secret_word: str,
+        word_embs: Optional[Union[np.ndarray, VocabMatrix]] = None,
+        secret_emb: Optional[np.ndarray] = None,
+        pos_masks: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Score many guesses against one secret in a single pass.
+        Same layers and weights as calculate_score, but returns NumPy
+        arrays and skips the messages/explanations.
+        """
+        if word_embs is None:
+            word_embs = self.model.encode(words, convert_to_numpy=True)
+        if secret_emb is None:
+            secret_emb = self.encode(secret_word)
+
+        # Semantic: one matrix-vector product on the stored (maybe compressed) form
+        semantic = as_vocab_matrix(word_embs).cosine(secret_emb)
+
+        # Lexical: rapidfuzz bulk Levenshtein against the secret
+        secret_lower = secret_word.lower()
+        distances = process.cdist(
+            [secret_lower], words,
+            scorer=Levenshtein.distance,
+            processor=str.lower,
+            dtype=np.int32,
+            workers=-1
+        )[0]
+        lengths = np.fromiter((len(w) for w in words), dtype=np.int32, count=len(words))
+        max_len = np.maximum(lengths, len(secret_lower))
+        lexical = np.where(
+            max_len == 0,
+            1.0,
+            np.maximum(0.0, 1 - distances / np.maximum(max_len, 1))
+        )
+
+        # Category: POS overlap from the precomputed bitmask table
+        if pos_masks is None:
+            pos_masks = self.pos_masks_for(words)
+        category = self.category_scores(pos_masks, self.pos_mask(secret_word))
+
+        return {
+            'score': self.combine(semantic, lexical, category).round(4),
+            'semantic': semantic,
+            'lexical': lexical,
+            'category': category
+        }
+
     def generate_message(self, semantic, lexical, category):
         if semantic > 0.8:
             if category == 1.0:
@@ -0,0 +1,228 @@
+import threading
+from typing import Iterator, Tuple, Union
+import numpy as np
+from script.embeddings import as_shared_matrix
+
+STORAGE_TYPES = ('float32', 'float16', 'int8', 'pq')
+
+
+class VocabMatrix:
+    """
+    Read-only vocabulary embedding matrix, possibly stored compressed.
+
+    Rows come back as float32; `dot`/`cosine` work block by block on the
+    stored form so a full float32 copy is never materialized.
+    """
+    storage = 'float32'
+    block_size = 4096
+
+    def __init__(self, shape: Tuple[int, int]):
+        self.shape = shape
+        self._norms = None
+        self._local = threading.local()
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        return self.rows(idx, idx + 1)[0]
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        raise NotImplementedError
+
+    @property
+    def nbytes(self) -> int:
+        raise NotImplementedError
+
+    def _scratch(self, rows: int) -> np.ndarray:
+        """Float32 block buffer reused across calls, one per thread (compute workers score concurrently)"""
+        buf = getattr(self._local, 'buf', None)
+        if buf is None or len(buf) < rows:
+            buf = self._local.buf = np.empty((rows, self.shape[1]), dtype=np.float32)
+        return buf[:rows]
+
+    def iter_blocks(self) -> Iterator[Tuple[int, np.ndarray]]:
+        for start in range(0, len(self), self.block_size):
+            yield start, self.rows(start, min(start + self.block_size, len(self)))
+
+    def dot(self, vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        out = np.empty(len(self), dtype=np.float32)
+        for start, block in self.iter_blocks():
+            out[start:start + len(block)] = block @ vector
+        return out
+
+    @property
+    def norms(self) -> np.ndarray:
+        if self._norms is None:
+            norms = np.empty(len(self), dtype=np.float32)
+            for start, block in self.iter_blocks():
+                norms[start:start + len(block)] = np.sqrt(np.einsum('ij,ij->i', block, block))
+            norms[norms == 0] = 1.0
+            self._norms = norms
+        return self._norms
+
+    def cosine(self, vector: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every row with `vector`"""
+        return self.dot(vector) / (self.norms * (np.linalg.norm(vector) or 1.0))
+
+    def cosine_at(self, idx: int, vector: np.ndarray) -> float:
+        """cosine(vector)[idx] for one row, without scoring the rest"""
+        return float(self[idx] @ vector) / float(self.norms[idx] * (np.linalg.norm(vector) or 1.0))
+
+
+class Float32Matrix(VocabMatrix):
+    storage = 'float32'
+
+    def __init__(self, matrix: np.ndarray):
+        super().__init__(matrix.shape)
+        self.matrix = as_shared_matrix(matrix)
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        return self.matrix[idx]
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        return self.matrix[start:stop]
+
+    def dot(self, vector: np.ndarray) -> np.ndarray:
+        return self.matrix @ np.asarray(vector, dtype=np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes
+
+
+class Float16Matrix(VocabMatrix):
+    """
+    Half-precision rows held as FAISS fp16 scalar-quantizer codes. NumPy
+    has no float16 matmul and its cast back to float32 costs ~10x the
+    float32 product, while FAISS decodes with F16C/SIMD inside its scan.
+    """
+    storage = 'float16'
+
+    def __init__(self, source: VocabMatrix):
+        import faiss
+
+        super().__init__(source.shape)
+        self.index = faiss.IndexScalarQuantizer(source.shape[1], faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+        for _, block in source.iter_blocks():
+            self.index.add(np.ascontiguousarray(block))
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        return self.index.reconstruct_n(start, stop - start)
+
+    def dot(self, vector: np.ndarray) -> np.ndarray:
+        query = np.asarray(vector, dtype=np.float32)[None, :]
+        scores, ids = self.index.search(query, len(self))
+        out = np.empty(len(self), dtype=np.float32)
+        out[ids[0]] = scores[0]
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return len(self) * self.index.code_size
+
+
+class Int8Matrix(VocabMatrix):
+    """Symmetric per-row scalar quantization: row ~= codes * scale"""
+    storage = 'int8'
+
+    def __init__(self, source: VocabMatrix):
+        super().__init__(source.shape)
+        self.codes = np.empty(source.shape, dtype=np.int8)
+        self.scales = np.empty(source.shape[0], dtype=np.float32)
+        for start, block in source.iter_blocks():
+            scales = np.abs(block).max(axis=1) / 127
+            scales[scales == 0] = 1.0
+            stop = start + len(block)
+            self.codes[start:stop] = np.rint(block / scales[:, None])
+            self.scales[start:stop] = scales
+        self.codes.flags.writeable = False
+        self.scales.flags.writeable = False
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        return self.codes[start:stop].astype(np.float32) * self.scales[start:stop, None]
+
+    def dot(self, vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        out = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), self.block_size):
+            stop = min(start + self.block_size, len(self))
+            # Widen into the reused buffer instead of allocating a block per call
+            block = self._scratch(stop - start)
+            np.copyto(block, self.codes[start:stop], casting='unsafe')
+            np.matmul(block, vector, out=out[start:stop])
+        # Scale once per row after the product instead of per element
+        out *= self.scales
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+
+class PQMatrix(VocabMatrix):
+    """FAISS product quantization: `m` sub-vectors of `nbits` each per row"""
+    storage = 'pq'
+
+    def __init__(self, source: VocabMatrix, m: int = 48, nbits: int = 8):
+        import faiss
+
+        super().__init__(source.shape)
+        dim = source.shape[1]
+        if dim % m:
+            raise ValueError(f"PQ sub-quantizers ({m}) must divide the embedding size ({dim})")
+
+        self.index = faiss.IndexPQ(dim, m, nbits, faiss.METRIC_INNER_PRODUCT)
+        sample = source.rows(0, min(len(source), 50_000))
+        self.index.train(np.ascontiguousarray(sample))
+        for _, block in source.iter_blocks():
+            self.index.add(np.ascontiguousarray(block))
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        return self.index.reconstruct_n(start, stop - start)
+
+    def dot(self, vector: np.ndarray) -> np.ndarray:
+        # Asymmetric distance computation straight on the PQ codes
+        query = np.asarray(vector, dtype=np.float32)[None, :]
+        scores, ids = self.index.search(query, len(self))
+        out = np.empty(len(self), dtype=np.float32)
+        out[ids[0]] = scores[0]
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        pq = self.index.pq
+        return len(self) * pq.code_size + pq.centroids.size() * 4
+
+
+def as_vocab_matrix(matrix: Union[np.ndarray, VocabMatrix]) -> VocabMatrix:
+    if isinstance(matrix, VocabMatrix):
+        return matrix
+    return Float32Matrix(matrix)
+
+
+def quantize(
+    matrix: Union[np.ndarray, VocabMatrix],
+    storage: str = 'float32',
+    pq_m: int = 48,
+    pq_nbits: int = 8
+) -> VocabMatrix:
+    """Convert the vocabulary matrix to the configured storage type"""
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"Unknown embedding storage '{storage}', expected one of {STORAGE_TYPES}")
+
+    source = as_vocab_matrix(matrix)
+    if storage == source.storage:
+        return source
+    if storage == 'float16':
+        quantized = Float16Matrix(source)
+    elif storage == 'int8':
+        quantized = Int8Matrix(source)
+    elif storage == 'pq':
+        quantized = PQMatrix(source, m=pq_m, nbits=pq_nbits)
+    else:
+        quantized = Float32Matrix(np.concatenate([block for _, block in source.iter_blocks()]))
+
+    print(f"✅ Vocabulary matrix stored as {storage}: {quantized.nbytes / 1e6:.1f}MB")
+    return quantized
@@ -0,0 +1,251 @@
+import hashlib
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from script.layer_score import LayeredScoring
+from script.quantization import VocabMatrix
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+class SecretRanking:
+    """
+    Immutable ranking of the whole vocabulary against one secret word.
+    Built once per secret and shared by every session playing it.
+    """
+    __slots__ = ('secret_word', 'secret_emb', 'scores', 'sorted_indices', 'sorted_scores', 'ranks')
+
+    def __init__(
+        self,
+        secret_word: str,
+        secret_emb: np.ndarray,
+        scores: np.ndarray,
+        sorted_indices: np.ndarray,
+        sorted_scores: np.ndarray,
+        ranks: np.ndarray
+    ):
+        self.secret_word = secret_word
+        self.secret_emb = _frozen(secret_emb)
+        self.scores = _frozen(scores)
+        self.sorted_indices = _frozen(sorted_indices)
+        self.sorted_scores = _frozen(sorted_scores)
+        # ranks[i] = position of vocabulary word i in sorted order
+        self.ranks = _frozen(ranks)
+
+    @classmethod
+    def build(
+        cls,
+        secret_word: str,
+        reference_words: List[str],
+        reference_embeddings: VocabMatrix,
+        scorer: LayeredScoring
+    ) -> "SecretRanking":
+        secret_word = secret_word.lower()
+
+        secret_emb = np.array(scorer.encode(secret_word), dtype=np.float32)
+
+        scores = scorer.calculate_scores_batch(
+            reference_words,
+            secret_word,
+            word_embs=reference_embeddings,
+            secret_emb=secret_emb
+        )['score']
+
+        sorted_indices = np.argsort(-scores, kind='stable').astype(np.int32)
+        ranks = np.empty(len(sorted_indices), dtype=np.int32)
+        ranks[sorted_indices] = np.arange(len(sorted_indices), dtype=np.int32)
+
+        return cls(
+            secret_word=secret_word,
+            secret_emb=secret_emb,
+            scores=scores,
+            sorted_indices=sorted_indices,
+            sorted_scores=scores[sorted_indices],
+            ranks=ranks
+        )
+
+    def rank_of(self, word_index: int) -> int:
+        return int(self.ranks[word_index])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.__slots__[1:])
+
+
+# Shared ranking file: magic, word count, embedding size, fingerprint of
+# the vocabulary and the "model|storage" label the scores were computed
+# with, then scores and sorted_scores (float64), secret_emb
+# (float32), sorted_indices and ranks (int32)
+RANKING_MAGIC = b"CTXRANK\0"
+RANKING_HEADER = struct.Struct("<8sqq8s")
+
+
+def vocabulary_fingerprint(words: List[str]) -> bytes:
+    return hashlib.blake2b("\n".join(words).encode("utf-8"), digest_size=8).digest()
+
+
+class SharedRankings:
+    """
+    Per-secret rankings as memory-mapped files in one directory. The first
+    worker that needs a secret builds and writes it; every other worker
+    maps the same pages instead of holding its own copy. Files written
+    for another vocabulary, model or storage are deleted on startup.
+    """
+
+    def __init__(self, directory: str, words: List[str], label: bytes):
+        self.directory = directory
+        self.count = len(words)
+        self.fingerprint = hashlib.blake2b(vocabulary_fingerprint(words) + label, digest_size=8).digest()
+        os.makedirs(directory, exist_ok=True)
+        self.prune()
+
+    def _current(self, header: bytes) -> bool:
+        if len(header) < RANKING_HEADER.size:
+            return False
+        magic, n, _, fingerprint = RANKING_HEADER.unpack(header[:RANKING_HEADER.size])
+        return magic == RANKING_MAGIC and n == self.count and fingerprint == self.fingerprint
+
+    def prune(self) -> int:
+        """Delete ranking files that don't match this vocabulary and label"""
+        removed = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".rank"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "rb") as f:
+                    if self._current(f.read(RANKING_HEADER.size)):
+                        continue
+                os.remove(path)
+                removed += 1
+            except OSError:
+                # Another worker replaced or removed it first
+                continue
+        if removed:
+            print(f"✅ Removed {removed} stale shared rankings from {self.directory}")
+        return removed
+
+    def path_for(self, secret_word: str) -> str:
+        name = hashlib.blake2b(secret_word.encode("utf-8"), digest_size=10).hexdigest()
+        return os.path.join(self.directory, f"{name}.rank")
+
+    def load(self, secret_word: str) -> Optional[SecretRanking]:
+        """Map a ranking written for this vocabulary and label (None if absent or stale)"""
+        try:
+            buf = np.memmap(self.path_for(secret_word), dtype=np.uint8, mode="r")
+        except (FileNotFoundError, ValueError):
+            return None
+        if not self._current(buf[:RANKING_HEADER.size].tobytes()):
+            return None
+        _, n, dim, _ = RANKING_HEADER.unpack(buf[:RANKING_HEADER.size].tobytes())
+        if len(buf) != RANKING_HEADER.size + n * 24 + dim * 4:
+            return None
+
+        offset = RANKING_HEADER.size
+        scores = buf[offset:offset + n * 8].view("<f8")
+        offset += n * 8
+        sorted_scores = buf[offset:offset + n * 8].view("<f8")
+        offset += n * 8
+        secret_emb = buf[offset:offset + dim * 4].view("<f4")
+        offset += dim * 4
+        sorted_indices = buf[offset:offset + n * 4].view("<i4")
+        offset += n * 4
+        ranks = buf[offset:offset + n * 4].view("<i4")
+        return SecretRanking(secret_word, secret_emb, scores, sorted_indices, sorted_scores, ranks)
+
+    def store(self, ranking: SecretRanking):
+        """Write atomically (tmp file + rename) so readers never see a partial file"""
+        path = self.path_for(ranking.secret_word)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(RANKING_HEADER.pack(RANKING_MAGIC, self.count, len(ranking.secret_emb), self.fingerprint))
+            f.write(ranking.scores.astype("<f8", copy=False).tobytes())
+            f.write(ranking.sorted_scores.astype("<f8", copy=False).tobytes())
+            f.write(ranking.secret_emb.astype("<f4", copy=False).tobytes())
+            f.write(ranking.sorted_indices.astype("<i4", copy=False).tobytes())
+            f.write(ranking.ranks.astype("<i4", copy=False).tobytes())
+        os.replace(tmp_path, path)
+
+
+class RankingCache:
+    """
+    Bounded LRU of SecretRanking keyed by secret word. Concurrent requests
+    for the same missing secret wait for a single build instead of each
+    building their own.
+    """
+
+    def __init__(self, builder: Callable[[str], SecretRanking], maxsize: int = 32):
+        self._builder = builder
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, SecretRanking]" = OrderedDict()
+        self._building: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, secret_word: str) -> Optional[SecretRanking]:
+        ranking = self._entries.get(secret_word)
+        if ranking is not None:
+            self._entries.move_to_end(secret_word)
+            self.hits += 1
+        return ranking
+
+    def get(self, secret_word: str) -> SecretRanking:
+        secret_word = secret_word.lower()
+
+        with self._lock:
+            ranking = self._lookup(secret_word)
+            if ranking is not None:
+                return ranking
+            build_lock = self._building.setdefault(secret_word, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                ranking = self._lookup(secret_word)
+                if ranking is not None:
+                    return ranking
+
+            ranking = self._builder(secret_word)
+
+            with self._lock:
+                self.misses += 1
+                self._entries[secret_word] = ranking
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                self._building.pop(secret_word, None)
+
+        return ranking
+
+    def peek(self, secret_word: str) -> Optional[SecretRanking]:
+        """The cached ranking, or None; never builds (safe on the event loop)"""
+        with self._lock:
+            return self._lookup(secret_word.lower())
+
+    def put(self, secret_word: str, ranking: SecretRanking):
+        """Insert a ranking built or mapped elsewhere (e.g. the warm secret pool)"""
+        with self._lock:
+            self._entries[secret_word.lower()] = ranking
+            self._entries.move_to_end(secret_word.lower())
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, secret_word: str) -> bool:
+        return secret_word.lower() in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'bytes': sum(r.nbytes for r in list(self._entries.values()))
+        }
@@ -0,0 +1,313 @@
+"""
+Precompute rankings for a pool of practice secrets, one memory-mapped
+archive per difficulty, so new practice games never build a ranking in
+the request.
+
+    cd backend
+    python -m script.secret_pool --per-difficulty 200
+    python -m script.secret_pool --difficulty hard --per-difficulty 500 --seed 1
+"""
+import argparse
+import os
+import random
+import struct
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from script.difficulty import DIFFICULTIES
+from script.ranking import SecretRanking, vocabulary_fingerprint
+
+# Archive file: magic, secret count, word count, embedding size, vocabulary
+# fingerprint, "model|storage" label the scores were computed with, then
+# the secrets' vocabulary indices (int32) and, 64-byte aligned, one block
+# per secret: scores, sorted_scores (float32), sorted_indices, ranks
+# (int32) and secret_emb (float32). Scores are rounded to 4 decimals when
+# built, so float32 keeps them exactly enough for ranks to match.
+POOL_MAGIC = b"CTXPOOL\0"
+POOL_HEADER = struct.Struct("<8sqqq8s64s")
+ALIGN = 64
+
+
+def archive_path(directory: str, difficulty: str) -> str:
+    return os.path.join(directory, f"{difficulty}.pool")
+
+
+def archive_label(model_name: str, storage: str) -> bytes:
+    return f"{model_name}|{storage}".encode("utf-8")[:64]
+
+
+def _block_size(n: int, dim: int) -> int:
+    return n * 16 + dim * 4
+
+
+def _data_offset(count: int) -> int:
+    end = POOL_HEADER.size + count * 4
+    return end + (-end) % ALIGN
+
+
+def write_archive(
+    path: str,
+    words: List[str],
+    secrets: List[str],
+    build: Callable[[str], SecretRanking],
+    label: bytes
+):
+    """Build and append one ranking at a time (memory stays at one ranking)"""
+    if not secrets:
+        # The header needs the first ranking's embedding size
+        raise ValueError(f"No secrets to write to {path}")
+    vocab_index = {word: i for i, word in enumerate(words)}
+    indices = np.array([vocab_index[s] for s in secrets], dtype="<i4")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    start = time.perf_counter()
+    with open(tmp_path, "wb") as f:
+        dim = None
+        for i, secret in enumerate(secrets):
+            ranking = build(secret)
+            if dim is None:
+                dim = len(ranking.secret_emb)
+                f.write(POOL_HEADER.pack(POOL_MAGIC, len(secrets), len(words), dim, vocabulary_fingerprint(words), label))
+                f.write(indices.tobytes())
+                f.write(b"\0" * (_data_offset(len(secrets)) - f.tell()))
+            f.write(ranking.scores.astype("<f4").tobytes())
+            f.write(ranking.sorted_scores.astype("<f4").tobytes())
+            f.write(ranking.sorted_indices.astype("<i4", copy=False).tobytes())
+            f.write(ranking.ranks.astype("<i4", copy=False).tobytes())
+            f.write(ranking.secret_emb.astype("<f4", copy=False).tobytes())
+            if (i + 1) % 50 == 0:
+                print(f"   {i + 1}/{len(secrets)} rankings ({time.perf_counter() - start:.0f}s)")
+    os.replace(tmp_path, path)
+    print(f"✅ Wrote {len(secrets)} rankings to {path} ({os.path.getsize(path) / 1e6:.1f}MB)")
+
+
+class SecretPoolArchive:
+    """
+    Read-only view of one archive. ranking(i) returns SecretRanking views
+    over the mapped file: no copy, no computation, shared by all workers.
+    """
+
+    def __init__(self, path: str, words: List[str], label: bytes):
+        buf = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(buf) < POOL_HEADER.size:
+            raise ValueError("truncated header")
+        magic, count, n, dim, fingerprint, stored_label = POOL_HEADER.unpack(buf[:POOL_HEADER.size].tobytes())
+        if magic != POOL_MAGIC:
+            raise ValueError("not a secret pool archive")
+        if n != len(words) or fingerprint != vocabulary_fingerprint(words):
+            raise ValueError("built for another vocabulary")
+        stored_label = stored_label.rstrip(b"\0")
+        if stored_label != label:
+            raise ValueError(f"built with {stored_label.decode()}, not {label.decode()}")
+        if len(buf) != _data_offset(count) + count * _block_size(n, dim):
+            raise ValueError("truncated rankings")
+
+        self.path = path
+        self._buf = buf
+        self.n = n
+        self.dim = dim
+        indices = buf[POOL_HEADER.size:POOL_HEADER.size + count * 4].view("<i4")
+        self.secrets = [words[i] for i in indices]
+        self._position = {secret: i for i, secret in enumerate(self.secrets)}
+
+    @classmethod
+    def open(cls, path: str, words: List[str], label: bytes) -> Optional["SecretPoolArchive"]:
+        """The archive at `path`, or None if there is none or it's stale"""
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path, words, label)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring secret pool archive {path}: {e}")
+            return None
+
+    def __len__(self) -> int:
+        return len(self.secrets)
+
+    def __contains__(self, secret_word: str) -> bool:
+        return secret_word in self._position
+
+    def ranking(self, i: int) -> SecretRanking:
+        n, dim = self.n, self.dim
+        offset = _data_offset(len(self.secrets)) + i * _block_size(n, dim)
+        buf = self._buf
+
+        def take(dtype: str, count: int) -> np.ndarray:
+            nonlocal offset
+            view = buf[offset:offset + count * 4].view(dtype)
+            offset += count * 4
+            return view
+
+        scores = take("<f4", n)
+        sorted_scores = take("<f4", n)
+        sorted_indices = take("<i4", n)
+        ranks = take("<i4", n)
+        secret_emb = take("<f4", dim)
+        return SecretRanking(self.secrets[i], secret_emb, scores, sorted_indices, sorted_scores, ranks)
+
+    def get(self, secret_word: str) -> Optional[SecretRanking]:
+        i = self._position.get(secret_word)
+        return self.ranking(i) if i is not None else None
+
+
+class SecretPool:
+    """
+    Ready-to-play practice secrets per difficulty. With an archive, take()
+    picks a random archived secret and maps its ranking. Without one, a
+    background thread keeps `warm` freshly built rankings queued per
+    difficulty and tops the queue up after every take().
+    """
+
+    def __init__(
+        self,
+        candidates: Dict[str, List[str]],
+        build: Callable[[str], SecretRanking],
+        archives: Optional[Dict[str, SecretPoolArchive]] = None,
+        warm: int = 4
+    ):
+        self.candidates = candidates
+        self.build = build
+        self.archives = archives or {}
+        self.warm = warm
+        # Own generator instead of the global one every thread shares
+        self._rng = random.Random()
+        self._ready: Dict[str, deque] = {difficulty: deque() for difficulty in candidates}
+        self._wakeup = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        self.served = 0
+        self.empty = 0
+        self.built = 0
+
+    def start(self):
+        """Start filling the warm queues (no-op when every difficulty has an archive)"""
+        if self._thread is not None or self.warm <= 0:
+            return
+        if all(difficulty in self.archives for difficulty in self.candidates):
+            return
+        self._thread = threading.Thread(target=self._run, name="secret-pool", daemon=True)
+        self._thread.start()
+
+    def archived(self, secret_word: str) -> Optional[SecretRanking]:
+        for archive in self.archives.values():
+            ranking = archive.get(secret_word)
+            if ranking is not None:
+                return ranking
+        return None
+
+    def ready(self, difficulty: str) -> int:
+        """Secrets take() can serve right now"""
+        archive = self.archives.get(difficulty)
+        if archive is not None:
+            return len(archive)
+        return len(self._ready.get(difficulty, ()))
+
+    def take(self, difficulty: str) -> Optional[Tuple[str, SecretRanking]]:
+        """A secret with its ranking ready, or None if the pool is empty"""
+        archive = self.archives.get(difficulty)
+        if archive is not None and len(archive):
+            i = self._rng.randrange(len(archive))
+            self.served += 1
+            return archive.secrets[i], archive.ranking(i)
+
+        ready = self._ready.get(difficulty)
+        if ready is None:
+            return None
+        try:
+            secret_and_ranking = ready.popleft()
+        except IndexError:
+            self.empty += 1
+            self.start()
+            return None
+        self.served += 1
+        with self._wakeup:
+            self._wakeup.notify()
+        return secret_and_ranking
+
+    def _next_short(self) -> Optional[str]:
+        # A difficulty without candidates (a small vocabulary's empty tier) is never filled
+        short = [
+            difficulty for difficulty, ready in self._ready.items()
+            if difficulty not in self.archives and self.candidates[difficulty] and len(ready) < self.warm
+        ]
+        # Refill the emptiest queue first
+        return min(short, key=lambda d: len(self._ready[d])) if short else None
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while not self._stopping and self._next_short() is None:
+                    self._wakeup.wait()
+                if self._stopping:
+                    return
+                difficulty = self._next_short()
+
+            secret = self._rng.choice(self.candidates[difficulty])
+            try:
+                ranking = self.build(secret)
+            except Exception as e:
+                print(f"⚠️  Secret pool could not build a ranking: {e}")
+                time.sleep(1)
+                continue
+            self._ready[difficulty].append((secret, ranking))
+            self.built += 1
+
+    def close(self):
+        if self._thread is not None:
+            with self._wakeup:
+                self._stopping = True
+                self._wakeup.notify()
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        return {
+            'archived': {difficulty: len(archive) for difficulty, archive in self.archives.items()},
+            'ready': {difficulty: self.ready(difficulty) for difficulty in self.candidates},
+            'warm': self.warm,
+            'served': self.served,
+            'empty': self.empty,
+            'built': self.built
+        }
+
+
+def main():
+    from config import SECRET_POOL_DIR, SECRET_POOL_SIZE, MODEL_NAME, EMBEDDING_STORAGE
+    from warmup import Warmup, build_game_manager
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=SECRET_POOL_DIR)
+    parser.add_argument("--difficulty", nargs="+", choices=DIFFICULTIES, default=list(DIFFICULTIES))
+    parser.add_argument("--per-difficulty", type=int, default=SECRET_POOL_SIZE, help="Secrets per archive")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    game_manager = build_game_manager(Warmup())
+    rng = random.Random(args.seed)
+    for difficulty in args.difficulty:
+        candidates = game_manager.difficulty_words[difficulty]
+        secrets = rng.sample(candidates, min(args.per_difficulty, len(candidates)))
+        if not secrets:
+            # An empty archive would only be rejected at every startup
+            print(f"⚠️  No {difficulty} secrets to precompute, skipping {archive_path(args.out, difficulty)}")
+            continue
+        print(f"Precomputing {len(secrets)} {difficulty} secrets...")
+        write_archive(
+            archive_path(args.out, difficulty),
+            game_manager.reference_words,
+            secrets,
+            lambda secret: SecretRanking.build(
+                secret,
+                game_manager.reference_words,
+                game_manager.reference_embeddings,
+                game_manager.scorer
+            ),
+            archive_label(MODEL_NAME, EMBEDDING_STORAGE)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import json
+import os
+import struct
+from datetime import datetime
+from typing import List, Optional
+import numpy as np
+
+# File layout (little endian):
+#   8 bytes   magic
+#   4 bytes   header length (uint32)
+#   N bytes   JSON header: version, model, counts, dtype, section offsets
+#   sections  words (utf-8, newline separated), frequency ranks (int32),
+#             embedding matrix (count x dim), each 64-byte aligned
+MAGIC = b"CTXSNAP\0"
+VERSION = 1
+ALIGN = 64
+
+
+class SnapshotError(ValueError):
+    """Snapshot file is missing pieces, corrupted or from another version"""
+
+
+class VocabularySnapshot:
+    """
+    Word list, frequency ranks and embedding matrix loaded from one file.
+    The matrix is memory-mapped read-only, so loading is near-instant and
+    every process on the host shares the same page cache.
+    """
+
+    def __init__(self, path: str, header: dict, words: List[str], frequency_ranks: np.ndarray, embeddings: np.ndarray):
+        self.path = path
+        self.header = header
+        self.words = words
+        self.frequency_ranks = frequency_ranks
+        self.embeddings = embeddings
+
+    @property
+    def version(self) -> int:
+        return self.header["version"]
+
+    @property
+    def model(self) -> str:
+        return self.header["model"]
+
+
+def _pad(f, alignment: int = ALIGN) -> int:
+    offset = f.tell()
+    padding = (-offset) % alignment
+    if padding:
+        f.write(b"\0" * padding)
+    return offset + padding
+
+
+def write_snapshot(
+    path: str,
+    words: List[str],
+    embeddings: np.ndarray,
+    model_name: str,
+    frequency_ranks: Optional[List[int]] = None
+):
+    """Write the snapshot atomically (tmp file + rename)"""
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if embeddings.shape[0] != len(words):
+        raise SnapshotError(f"{len(words)} words but {embeddings.shape[0]} embedding rows")
+    if frequency_ranks is None:
+        frequency_ranks = range(1, len(words) + 1)
+    ranks = np.asarray(list(frequency_ranks), dtype="<i4")
+
+    words_blob = "\n".join(words).encode("utf-8")
+    sections = {}
+
+    # Offsets depend on the header size, so lay out with a fixed-size
+    # placeholder first, then write the real header into the same space
+    header = {
+        "version": VERSION,
+        "model": model_name,
+        "count": len(words),
+        "dim": int(embeddings.shape[1]),
+        "dtype": "float32",
+        "created_at": datetime.now().isoformat(),
+        "sections": sections,
+    }
+    header_space = len(json.dumps({**header, "sections": {k: [2**40, 2**40] for k in ("words", "frequency_ranks", "embeddings")}})) + 64
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", header_space))
+        f.write(b" " * header_space)
+
+        sections["words"] = [_pad(f), len(words_blob)]
+        f.write(words_blob)
+        sections["frequency_ranks"] = [_pad(f), ranks.nbytes]
+        f.write(ranks.tobytes())
+        sections["embeddings"] = [_pad(f), embeddings.nbytes]
+        f.write(embeddings.astype("<f4", copy=False).tobytes())
+
+        encoded = json.dumps(header).encode("utf-8")
+        f.seek(len(MAGIC) + 4)
+        f.write(encoded.ljust(header_space))
+
+    os.replace(tmp_path, path)
+    print(f"✅ Wrote vocabulary snapshot v{VERSION} ({len(words)} words, {embeddings.shape[1]}d) to {path}")
+
+
+def read_snapshot(path: str) -> VocabularySnapshot:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise SnapshotError(f"{path} is not a vocabulary snapshot")
+        (header_len,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+
+        if header.get("version") != VERSION:
+            raise SnapshotError(f"{path} is snapshot v{header.get('version')}, expected v{VERSION}")
+
+        offset, size = header["sections"]["words"]
+        f.seek(offset)
+        words = f.read(size).decode("utf-8").split("\n") if size else []
+
+    count, dim = header["count"], header["dim"]
+    if len(words) != count:
+        raise SnapshotError(f"{path} header says {count} words but contains {len(words)}")
+
+    ranks_offset, _ = header["sections"]["frequency_ranks"]
+    frequency_ranks = np.memmap(path, dtype="<i4", mode="r", offset=ranks_offset, shape=(count,))
+
+    emb_offset, _ = header["sections"]["embeddings"]
+    embeddings = np.memmap(path, dtype="<f4", mode="r", offset=emb_offset, shape=(count, dim))
+
+    return VocabularySnapshot(path, header, words, frequency_ranks, embeddings)
+
+
+def load_snapshot(path: str) -> Optional[VocabularySnapshot]:
+    """read_snapshot, but None (with a warning) when there's no usable file"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return read_snapshot(path)
+    except (SnapshotError, OSError, KeyError, json.JSONDecodeError) as e:
+        print(f"⚠️  Ignoring vocabulary snapshot at {path}: {e}")
+        return None
@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from rapidfuzz.distance.OSA import distance as osa_distance
+from script.layer_score import wordnet
+
+# Inflection suffix -> endings to try instead, most likely first
+# (cats -> cat, boxes -> box, cities -> city, baked -> bake, running -> run)
+SUFFIX_RULES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('ies', ('y',)),
+    ('ied', ('y',)),
+    ('iest', ('y',)),
+    ('ier', ('y',)),
+    ('ves', ('f', 'fe')),
+    ('ing', ('', 'e')),
+    ('est', ('', 'e')),
+    ('es', ('', 'e')),
+    ('ed', ('', 'e')),
+    ('er', ('', 'e')),
+    ('s', ('',)),
+)
+VOWELS = set('aeiou')
+
+# Shortest guess a typo is corrected for (short words are one edit from many others)
+MIN_TYPO_LENGTH = 5
+
+
+def inflection_candidates(word: str) -> List[str]:
+    """Base forms a regular inflection could come from (not checked against anything)"""
+    candidates = []
+    for suffix, endings in SUFFIX_RULES:
+        if not word.endswith(suffix) or len(word) - len(suffix) < 2:
+            continue
+        stem = word[:-len(suffix)]
+        if suffix == 's' and stem.endswith(('s', 'u', 'i')):
+            # glass, bus, cactus: not plurals of glas, bu, cactu
+            continue
+        candidates.extend(stem + ending for ending in endings)
+        # running -> run, stopped -> stop
+        if suffix in ('ing', 'ed', 'er', 'est') and len(stem) >= 3 and stem[-1] == stem[-2] and stem[-1] not in VOWELS:
+            candidates.append(stem[:-1])
+    return candidates
+
+
+def wordnet_forms(word: str) -> Optional[Tuple[bool, List[str]]]:
+    """
+    (whether WordNet has the word itself as a lemma, the other base forms
+    morphy finds for it), or None when WordNet isn't available.
+    summer -> (True, [...]); cats -> (False, ['cat']); mice -> (False, ['mouse'])
+    """
+    try:
+        corpus = wordnet()
+        if corpus.lemmas(word):
+            return True, []
+        lemmas = []
+        for pos in ('n', 'v', 'a', 'r'):
+            lemma = corpus.morphy(word, pos)
+            if lemma and lemma != word and lemma not in lemmas:
+                lemmas.append(lemma)
+        return False, lemmas
+    except Exception:
+        return None
+
+
+def _deletes(word: str) -> set:
+    """The word and every string one deletion away from it"""
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class TypoIndex:
+    """
+    Vocabulary words within one edit (insertion, deletion, substitution or
+    adjacent transposition) of a guess, by symmetric deletion: two strings
+    one edit apart share a one-deletion variant. Variant hashes of the
+    whole vocabulary sit in one sorted array (about 10 bytes per variant),
+    so a lookup is a few binary searches plus an OSA check per candidate.
+    """
+
+    def __init__(self, words: List[str]):
+        self.words = words
+        hashes: List[int] = []
+        owners: List[int] = []
+        for i, word in enumerate(words):
+            for variant in _deletes(word):
+                hashes.append(hash(variant))
+                owners.append(i)
+        keys = np.array(hashes, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.owners = np.array(owners, dtype=np.int32)[order]
+
+    def search(self, word: str) -> List[Tuple[int, int]]:
+        """(distance, word index) of vocabulary words within one edit, closest then most frequent first"""
+        hashes = np.array([hash(v) for v in _deletes(word)], dtype=np.int64)
+        lo = np.searchsorted(self.keys, hashes, side='left')
+        hi = np.searchsorted(self.keys, hashes, side='right')
+        found = []
+        for idx in {int(i) for a, b in zip(lo, hi) for i in self.owners[a:b]}:
+            # Hash collisions and two-edit pairs sharing a variant are dropped here
+            d = osa_distance(word, self.words[idx], score_cutoff=1)
+            if d <= 1:
+                found.append((d, idx))
+        found.sort()
+        return found
+
+
+class VariantIndex:
+    """
+    Maps guesses that aren't vocabulary entries to one that is: the base
+    form WordNet's morphy gives for inflections (cats, mice, running) and,
+    for words WordNet doesn't know at all, regular suffix rules and
+    one-edit typos. A word WordNet has as a lemma of its own (summer,
+    news, number) is never mapped to another word, and without WordNet
+    nothing is. Candidates are memoized per guess in a bounded LRU.
+    """
+
+    def __init__(self, words: List[str], vocab_index: Dict[str, int], typos: bool = True, cache_size: int = 50_000):
+        self.vocab_index = vocab_index
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, str], ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.resolved = 0
+        self.unresolved = 0
+
+        start = time.perf_counter()
+        self.typos = TypoIndex(words) if typos else None
+        if self.typos is not None:
+            print(f"✅ Typo index built over {len(words)} words in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def candidates(self, word: str) -> Tuple[Tuple[int, str], ...]:
+        """(vocabulary index, how it matched) in order of preference"""
+        with self._lock:
+            cached = self._cache.get(word)
+            if cached is not None:
+                self._cache.move_to_end(word)
+                return cached
+
+        found: List[Tuple[int, str]] = []
+        seen = set()
+
+        def add(candidate: str, kind: str):
+            idx = self.vocab_index.get(candidate)
+            if idx is not None and idx not in seen:
+                seen.add(idx)
+                found.append((idx, kind))
+
+        # Without WordNet a real word can't be told apart from an inflection or
+        # a typo (summer is not sum + er), and a real word is scored as itself
+        forms = wordnet_forms(word)
+        if forms is not None and not forms[0]:
+            lemmas = forms[1]
+            for lemma in lemmas:
+                add(lemma, 'inflection')
+
+            if not lemmas:
+                # Unknown to WordNet: maybe a regular inflection it lacks, or a typo
+                for candidate in inflection_candidates(word):
+                    add(candidate, 'inflection')
+                if not found and self.typos is not None and len(word) >= MIN_TYPO_LENGTH:
+                    for _, idx in self.typos.search(word):
+                        if idx not in seen:
+                            seen.add(idx)
+                            found.append((idx, 'typo'))
+
+        result = tuple(found)
+        with self._lock:
+            self._cache[word] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def resolve(self, word: str, exclude: Optional[int] = None) -> Optional[Tuple[int, str]]:
+        """
+        Best vocabulary entry for an out-of-vocabulary guess. None when
+        there is none or when it is `exclude` (the secret): a misspelling
+        or plural of the secret neither wins nor takes a neighbour's score,
+        it goes through the model like any other new word.
+        """
+        candidates = self.candidates(word)
+        if not candidates or candidates[0][0] == exclude:
+            self.unresolved += 1
+            return None
+        self.resolved += 1
+        return candidates[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'cached': len(self._cache),
+            'resolved': self.resolved,
+            'unresolved': self.unresolved
+        }
@@ -0,0 +1,114 @@
+"""
+Multi-worker launcher. The parent prepares what the workers share, then
+starts uvicorn with N worker processes:
+
+- the vocabulary snapshot, memory-mapped read-only by every worker, is
+  read once here so its pages are already in the page cache;
+- SESSION_BACKEND defaults to sqlite: workers share one socket with no
+  sticky routing, so any worker must be able to serve any game;
+- RANKING_SHARE_DIR (default DATA_DIR/rankings) holds the per-secret
+  rankings each worker maps instead of rebuilding (it persists across
+  restarts; files from another vocabulary, model or storage are pruned);
+- with --encoder-process, one process loads the sentence transformer and
+  serves every worker over a Unix socket.
+
+    cd backend
+    python serve.py --workers 4 --encoder-process
+"""
+import argparse
+import os
+import secrets
+import sys
+import time
+from multiprocessing import Process
+from functools import partial
+from config import (
+    DATA_DIR,
+    MODEL_NAME,
+    SNAPSHOT_PATH,
+    ENCODER_MAX_BATCH_SIZE,
+    ENCODER_MAX_WAIT_MS,
+    ENCODER_BACKEND,
+    ONNX_MODEL_DIR,
+    ONNX_INT8
+)
+
+
+def prefault(path: str, chunk_size: int = 1 << 24) -> int:
+    """Read a file once so workers mapping it start from a warm page cache"""
+    total = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return total
+            total += len(chunk)
+
+
+def start_encoder_process(address: str, authkey: str, timeout: float = 120.0) -> Process:
+    from script.encoder_service import serve_encoder
+    from script.encoder_backends import load_local_model
+
+    load_model = partial(load_local_model, ENCODER_BACKEND, MODEL_NAME, ONNX_MODEL_DIR, int8=ONNX_INT8)
+    process = Process(
+        target=serve_encoder,
+        args=(address, authkey.encode(), load_model, ENCODER_MAX_BATCH_SIZE, ENCODER_MAX_WAIT_MS),
+        name="encoder-service",
+        daemon=True
+    )
+    process.start()
+
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(address):
+        if not process.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("Encoder service did not start")
+        time.sleep(0.1)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--encoder-process", action="store_true",
+                        help="Load the model once in a dedicated process shared by all workers")
+    args = parser.parse_args()
+
+    if os.path.exists(SNAPSHOT_PATH):
+        size = prefault(SNAPSHOT_PATH)
+        print(f"✅ Vocabulary snapshot in page cache ({size / 1e6:.1f}MB), shared by all workers")
+    else:
+        print(f"⚠️  No vocabulary snapshot at {SNAPSHOT_PATH}; run `python -m script.build_snapshot` "
+              "first or every worker will build its own")
+
+    # Children inherit the environment, and config.py reads it on import
+    os.environ.setdefault("RANKING_SHARE_DIR", os.path.join(DATA_DIR, "rankings"))
+    os.environ.setdefault("SESSION_BACKEND", "sqlite")
+    if args.workers > 1 and os.environ["SESSION_BACKEND"] == "memory":
+        print("❌ SESSION_BACKEND=memory keeps games in one worker; use sqlite or mongo with --workers > 1")
+        return 1
+
+    encoder = None
+    if args.encoder_process:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        address = os.path.join(DATA_DIR, f"encoder-{os.getpid()}.sock")
+        authkey = secrets.token_hex(16)
+        encoder = start_encoder_process(address, authkey)
+        os.environ["ENCODER_ADDRESS"] = address
+        os.environ["ENCODER_AUTHKEY"] = authkey
+
+    import uvicorn
+    try:
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        if encoder is not None:
+            encoder.terminate()
+            encoder.join(timeout=5)
+            if os.path.exists(os.environ["ENCODER_ADDRESS"]):
+                os.remove(os.environ["ENCODER_ADDRESS"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+SESSION_BACKENDS = ('memory', 'sqlite', 'mongo')
+
+# Coalesced changes per game, as produced by SessionWriter:
+#   {game_id: {'create': doc or None, 'guesses': [guess docs],
+#              'set': {fields}, 'max': {fields}, 'add': {field: [values]}}}
+# Only 'set' overwrites; 'max' and 'add' merge with what other workers
+# wrote, so a worker holding a stale copy can't undo their changes.
+Changes = Dict[str, Dict]
+
+
+class SessionBackend:
+    """Where game sessions live so every worker process can serve any game"""
+    name = 'memory'
+
+    def load(self, game_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def version(self, game_id: str) -> Optional[int]:
+        """How many writes the stored session has had, None if there is none"""
+        raise NotImplementedError
+
+    def write(self, changes: Changes):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def apply_change(doc: Optional[Dict], change: Dict) -> Optional[Dict]:
+    """Apply one coalesced change to a stored session document"""
+    if change['create'] is not None:
+        doc = dict(change['create'])
+    if doc is None:
+        return None
+    doc['guesses'] = doc.get('guesses', []) + change['guesses']
+    doc.update(change['set'])
+    for field, value in change['max'].items():
+        doc[field] = max(doc.get(field, value), value)
+    for field, values in change['add'].items():
+        doc[field] = sorted(set(doc.get(field, [])).union(values))
+    doc['version'] = doc.get('version', 0) + 1
+    return doc
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    One SQLite file shared by all workers on a host. Each flush is a
+    single IMMEDIATE transaction, so workers writing the same game
+    serialize instead of overwriting each other.
+    """
+    name = 'sqlite'
+
+    def __init__(self, path: str, ttl_seconds: float = 6 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "game_id TEXT PRIMARY KEY, doc TEXT NOT NULL, last_access REAL NOT NULL, "
+                "version INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if 'version' not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, game_id: str) -> Optional[Dict]:
+        row = self._connect().execute("SELECT doc FROM sessions WHERE game_id = ?", (game_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def version(self, game_id: str) -> Optional[int]:
+        row = self._connect().execute("SELECT version FROM sessions WHERE game_id = ?", (game_id,)).fetchone()
+        return row[0] if row else None
+
+    def write(self, changes: Changes):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for game_id, change in changes.items():
+                row = conn.execute("SELECT doc FROM sessions WHERE game_id = ?", (game_id,)).fetchone()
+                doc = apply_change(json.loads(row[0]) if row else None, change)
+                if doc is None:
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (game_id, doc, last_access, version) VALUES (?, ?, ?, ?)",
+                    (game_id, json.dumps(doc), doc['last_access'], doc['version'])
+                )
+            conn.execute("DELETE FROM sessions WHERE last_access < ?", (time.time() - self.ttl_seconds,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class MongoSessionBackend(SessionBackend):
+    """
+    The game_sessions collection, one bulk_write per flush. Callers are
+    threads (compute workers, the session writer), so this uses its own
+    synchronous pymongo client: the app's Motor client belongs to the
+    request event loop and can't be driven from anywhere else.
+    """
+    name = 'mongo'
+
+    def __init__(self):
+        from pymongo import MongoClient
+        from database import DB_NAME, connection_params, _require_mongo_url
+        self._client = MongoClient(_require_mongo_url(), **connection_params)
+        self._collection = self._client[DB_NAME]["game_sessions"]
+
+    def load(self, game_id: str) -> Optional[Dict]:
+        return self._collection.find_one({"game_id": game_id}, {"_id": 0})
+
+    def version(self, game_id: str) -> Optional[int]:
+        doc = self._collection.find_one({"game_id": game_id}, {"_id": 0, "version": 1})
+        return doc.get("version", 0) if doc else None
+
+    def write(self, changes: Changes):
+        from database import session_change_operations
+        operations = session_change_operations(changes)
+        if operations:
+            self._collection.bulk_write(operations, ordered=False)
+
+    def close(self):
+        self._client.close()
+
+
+def make_session_backend(name: str, sqlite_path: str, ttl_seconds: float) -> Optional[SessionBackend]:
+    """None for the default process-local store"""
+    if name not in SESSION_BACKENDS:
+        raise ValueError(f"Unknown session backend '{name}', expected one of {SESSION_BACKENDS}")
+    if name == 'sqlite':
+        return SQLiteSessionBackend(sqlite_path, ttl_seconds=ttl_seconds)
+    if name == 'mongo':
+        return MongoSessionBackend()
+    return None
@@ -0,0 +1,407 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from session_backends import SessionBackend
+
+# (word, rank, score, timestamp)
+Guess = Tuple[str, int, float, float]
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+def _timestamp(iso: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(iso).timestamp() if iso else None
+
+
+def guess_doc(guess: Guess) -> Dict:
+    word, rank, score, timestamp = guess
+    return {'word': word, 'rank': rank, 'score': score, 'timestamp': _iso(timestamp)}
+
+
+class GameSession:
+    """
+    Everything a game needs between requests. The heavy, immutable parts
+    (vocabulary, per-secret ranking, FAISS index) are shared and looked up
+    by `secret_index`, so a session is a few hundred bytes.
+    """
+    __slots__ = (
+        'game_id', 'secret_index', 'mode', 'difficulty', 'date', 'started_at',
+        'completed_at', 'guesses', 'won', 'hint_cursor', 'seen_words', 'last_access',
+        'version'
+    )
+
+    def __init__(self, game_id: str, secret_index: int, mode: str, difficulty: str):
+        self.game_id = game_id
+        self.secret_index = secret_index
+        self.mode = mode
+        self.difficulty = difficulty
+        # Day the game belongs to (daily word, daily stats)
+        self.date = date.today().isoformat()
+        self.started_at = time.time()
+        self.completed_at: Optional[float] = None
+        self.guesses: List[Guess] = []
+        self.won = False
+        self.hint_cursor = 0
+        self.seen_words: Set[str] = set()
+        self.last_access = self.started_at
+        # Backend writes this copy reflects (shared stores only)
+        self.version = 0
+
+    def state(self) -> Dict:
+        """Fields that change after creation (besides the appended guesses)"""
+        return {
+            'won': self.won,
+            'completed_at': _iso(self.completed_at),
+            'hint_cursor': self.hint_cursor,
+            'seen_words': sorted(self.seen_words),
+            'last_access': self.last_access
+        }
+
+    def update(self) -> Dict:
+        """
+        state() as merge operations for a shared backend: a worker with a
+        stale copy can only add to what others wrote (the hint cursor and
+        last access only move forward, seen words only grow, a win is
+        never undone).
+        """
+        update = {
+            'set': {},
+            'max': {'hint_cursor': self.hint_cursor, 'last_access': self.last_access},
+            'add': {'seen_words': sorted(self.seen_words)}
+        }
+        if self.won:
+            update['set'] = {'won': True, 'completed_at': _iso(self.completed_at)}
+        return update
+
+    def to_doc(self) -> Dict:
+        return {
+            'game_id': self.game_id,
+            'secret_index': self.secret_index,
+            'mode': self.mode,
+            'difficulty': self.difficulty,
+            'date': self.date,
+            'started_at': _iso(self.started_at),
+            'guesses': [guess_doc(g) for g in self.guesses],
+            'version': self.version,
+            **self.state()
+        }
+
+    @classmethod
+    def from_doc(cls, doc: Dict) -> 'GameSession':
+        session = cls(doc['game_id'], doc['secret_index'], doc['mode'], doc['difficulty'])
+        session.date = doc.get('date', session.date)
+        session.started_at = _timestamp(doc['started_at'])
+        session.completed_at = _timestamp(doc.get('completed_at'))
+        session.guesses = [
+            (g['word'], g['rank'], g['score'], _timestamp(g['timestamp']))
+            for g in doc.get('guesses', [])
+        ]
+        session.won = doc.get('won', False)
+        session.hint_cursor = doc.get('hint_cursor', 0)
+        session.seen_words = set(doc.get('seen_words', []))
+        session.last_access = doc.get('last_access', session.started_at)
+        session.version = doc.get('version', 0)
+        return session
+
+    def approx_bytes(self) -> int:
+        size = sys.getsizeof(self) + sys.getsizeof(self.game_id)
+        size += sys.getsizeof(self.guesses) + sum(
+            sys.getsizeof(g) + sys.getsizeof(g[0]) for g in self.guesses
+        )
+        size += sys.getsizeof(self.seen_words) + sum(sys.getsizeof(w) for w in self.seen_words)
+        return size
+
+
+class SessionWriter:
+    """
+    Write-behind for a shared session backend. Changes are coalesced per
+    game and handed to the backend in batches from a background thread,
+    every `flush_interval_ms` or as soon as `max_batch` games are pending.
+
+    Memory is bounded by `max_pending` games: if the backend falls that far
+    behind, changes to further games are dropped (and counted) rather than
+    making requests wait on the database.
+    """
+
+    def __init__(
+        self,
+        backend: SessionBackend,
+        flush_interval_ms: float = 50,
+        max_batch: int = 256,
+        max_pending: int = 10_000,
+        on_written: Optional[Callable[[Iterable[str]], None]] = None
+    ):
+        self.backend = backend
+        self.on_written = on_written
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self.max_pending = max(max_pending, max_batch)
+        self._pending: "OrderedDict[str, Dict]" = OrderedDict()
+        self._pending_guesses = 0
+        self._inflight: Set[str] = set()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self.written_games = 0
+        self.written_guesses = 0
+        self.flush_ms_total = 0.0
+        self.flush_ms_max = 0.0
+        self.last_flush_ms = 0.0
+
+    def submit(self, game_id: str, create: Optional[Dict] = None, guess: Optional[Dict] = None, update: Optional[Dict] = None):
+        with self._cond:
+            change = self._pending.get(game_id)
+            if change is None:
+                if len(self._pending) >= self.max_pending:
+                    self.dropped += 1
+                    return
+                change = self._pending[game_id] = {'create': None, 'guesses': [], 'set': {}, 'max': {}, 'add': {}}
+            if create is not None:
+                change['create'] = create
+            if guess is not None:
+                change['guesses'].append(guess)
+                self._pending_guesses += 1
+            if update:
+                change['set'].update(update.get('set', {}))
+                for field, value in update.get('max', {}).items():
+                    change['max'][field] = max(change['max'].get(field, value), value)
+                for field, values in update.get('add', {}).items():
+                    change['add'][field] = sorted(set(change['add'].get(field, [])).union(values))
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+
+    def is_dirty(self, game_id: str) -> bool:
+        """Has changes the backend doesn't have yet"""
+        with self._cond:
+            return game_id in self._pending or game_id in self._inflight
+
+    def _flush_once(self):
+        with self._cond:
+            batch, self._pending = self._pending, OrderedDict()
+            guesses, self._pending_guesses = self._pending_guesses, 0
+            self._inflight = set(batch)
+        if batch:
+            start = time.perf_counter()
+            try:
+                self.backend.write(batch)
+                self.flushes += 1
+                self.written_games += len(batch)
+                self.written_guesses += guesses
+                if self.on_written:
+                    self.on_written(batch)
+            except Exception as e:
+                self.failures += 1
+                print(f"⚠️  Failed to persist {len(batch)} game sessions: {e}")
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.last_flush_ms = elapsed_ms
+            self.flush_ms_total += elapsed_ms
+            self.flush_ms_max = max(self.flush_ms_max, elapsed_ms)
+        with self._cond:
+            self._inflight = set()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._pending) < self.max_batch:
+                    self._cond.wait(timeout=self.flush_interval)
+                stopping = self._stopping
+            self._flush_once()
+            if stopping:
+                return
+
+    def close(self):
+        """Flush whatever is pending and stop the thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout=10)
+
+    def stats(self) -> Dict[str, float]:
+        attempts = self.flushes + self.failures
+        return {
+            'pending_games': len(self._pending),
+            'pending_guesses': self._pending_guesses,
+            'max_pending': self.max_pending,
+            'flushes': self.flushes,
+            'failures': self.failures,
+            'dropped': self.dropped,
+            'written_games': self.written_games,
+            'written_guesses': self.written_guesses,
+            'last_flush_ms': round(self.last_flush_ms, 2),
+            'avg_flush_ms': round(self.flush_ms_total / attempts, 2) if attempts else 0.0,
+            'max_flush_ms': round(self.flush_ms_max, 2)
+        }
+
+
+class SessionStore:
+    """
+    Sessions with a TTL on idle time and a hard cap on count. Kept in
+    access order, so both expired and least-recently-used games are
+    evicted from the front.
+
+    With a shared `backend` (SQLite, MongoDB) the local copies are only a
+    cache: changes are written behind by a SessionWriter as merges, and
+    `refresh` reloads a game only when another worker has written it
+    since (its version moved past the writes this worker made).
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 6 * 3600,
+        max_sessions: int = 10_000,
+        backend: Optional[SessionBackend] = None,
+        flush_interval_ms: float = 50,
+        max_batch: int = 256,
+        max_pending: int = 10_000
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.backend = backend
+        self.writer = SessionWriter(
+            backend, flush_interval_ms, max_batch, max_pending, on_written=self._written
+        ) if backend else None
+        self._sessions: "OrderedDict[str, GameSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evicted = 0
+
+    @property
+    def shared(self) -> bool:
+        return self.backend is not None
+
+    def _evict(self, now: float):
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_access <= self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+            self.expired += 1
+
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def _cache(self, session: GameSession):
+        with self._lock:
+            self._sessions[session.game_id] = session
+            self._evict(time.time())
+
+    def add(self, session: GameSession):
+        self._cache(session)
+        if self.writer:
+            self.writer.submit(session.game_id, create=session.to_doc())
+
+    def save(self, session: GameSession, guess: Optional[Guess] = None):
+        """Persist a change made to `session` (no-op for the in-memory store)"""
+        if self.writer:
+            self.writer.submit(
+                session.game_id,
+                guess=guess_doc(guess) if guess else None,
+                update=session.update()
+            )
+
+    def _written(self, game_ids: Iterable[str]):
+        # Each flushed change bumps the stored version by one
+        with self._lock:
+            for game_id in game_ids:
+                session = self._sessions.get(game_id)
+                if session is not None:
+                    session.version += 1
+
+    def _load(self, game_id: str) -> Optional[GameSession]:
+        doc = self.backend.load(game_id)
+        if doc is None or time.time() - doc.get('last_access', 0) > self.ttl_seconds:
+            return None
+        session = GameSession.from_doc(doc)
+        self._cache(session)
+        return session
+
+    def get(self, game_id: str, load: bool = True) -> Optional[GameSession]:
+        """Local copy, else (with load=True) the one in the shared backend"""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(game_id)
+            if session is not None and now - session.last_access > self.ttl_seconds:
+                del self._sessions[game_id]
+                self.expired += 1
+                return None
+            if session is not None:
+                session.last_access = now
+                self._sessions.move_to_end(game_id)
+                return session
+
+        return self._load(game_id) if self.backend and load else None
+
+    def refresh(self, game_id: str):
+        """
+        Bring the local copy of a shared session up to date (blocking
+        backend I/O): load it on a cache miss, otherwise read only the
+        stored version and reload when another worker has written the game.
+        A copy with unwritten changes is kept, and so is any copy the
+        backend fails to return.
+        """
+        if not self.backend:
+            return
+        with self._lock:
+            session = self._sessions.get(game_id)
+        if session is None:
+            self._load(game_id)
+            return
+        if self.writer.is_dirty(game_id):
+            return
+        try:
+            version = self.backend.version(game_id)
+            if version is not None and version != session.version:
+                self._load(game_id)
+        except Exception as e:
+            print(f"⚠️  Could not refresh game {game_id}, keeping the local copy: {e}")
+
+    def remove(self, game_id: str):
+        with self._lock:
+            self._sessions.pop(game_id, None)
+
+    def evict_expired(self):
+        with self._lock:
+            self._evict(time.time())
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def approx_bytes(self, sample_size: int = 100) -> int:
+        """Estimated from a sample so /status stays cheap with many games"""
+        with self._lock:
+            count = len(self._sessions)
+            sample = [s for _, s in zip(range(sample_size), reversed(self._sessions.values()))]
+        if not sample:
+            return 0
+        return int(sum(s.approx_bytes() for s in sample) / len(sample) * count)
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+            self.backend.close()
+
+    def stats(self) -> Dict:
+        self.evict_expired()
+        return {
+            'backend': self.backend.name if self.backend else 'memory',
+            'writer': self.writer.stats() if self.writer else None,
+            'active': len(self._sessions),
+            'max_sessions': self.max_sessions,
+            'ttl_seconds': int(self.ttl_seconds),
+            'approx_bytes': self.approx_bytes(),
+            'expired': self.expired,
+            'evicted': self.evicted
+        }
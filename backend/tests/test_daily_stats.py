@@ -0,0 +1,31 @@
+import sys
+import types
+from daily_stats import DailyStats, StatsMaterializer
+
+
+def test_failed_flush_restores_only_unwritten_days(monkeypatch):
+    written = {}
+
+    def increment_daily_stats(date_str, delta):
+        if date_str == "2026-01-02":
+            raise OSError("connection reset")
+        written[date_str] = written.get(date_str, 0) + delta.games
+
+    # Stand-in for the MongoDB $inc, failing on the second day
+    monkeypatch.setitem(sys.modules, "database", types.SimpleNamespace(increment_daily_stats=increment_daily_stats))
+
+    stats = DailyStats()
+    stats.record_start("2026-01-01")
+    stats.record_start("2026-01-02")
+    materializer = StatsMaterializer(stats, interval_seconds=3600)
+    try:
+        materializer.flush()
+        assert written == {"2026-01-01": 1}
+        assert stats.pending("2026-01-01").games == 0
+        assert stats.pending("2026-01-02").games == 1
+
+        materializer.flush()
+        assert written == {"2026-01-01": 1}
+        assert materializer.failures == 2
+    finally:
+        materializer._stop.set()
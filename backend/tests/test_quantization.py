@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+from script.quantization import quantize
+
+
+@pytest.mark.parametrize("storage", ["float32", "float16", "int8", "pq"])
+def test_cosine_at_matches_whole_vocabulary_cosine(storage):
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((600, 32)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    stored = quantize(matrix, storage, pq_m=8, pq_nbits=4)
+    secret = matrix[3]
+    scores = stored.cosine(secret)
+    for idx in (0, 3, 599):
+        assert stored.cosine_at(idx, secret) == pytest.approx(float(scores[idx]), abs=1e-5)
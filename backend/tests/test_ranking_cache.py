@@ -0,0 +1,23 @@
+import numpy as np
+from script.ranking import RankingCache, SecretRanking
+
+
+def build(secret: str) -> SecretRanking:
+    scores = np.array([1.0, 0.5])
+    order = np.array([0, 1], dtype=np.int32)
+    return SecretRanking(secret, np.ones(2, dtype=np.float32), scores, order, scores, order + 1)
+
+
+def test_peek_never_builds():
+    built = []
+    cache = RankingCache(lambda secret: built.append(secret) or build(secret), maxsize=1)
+    assert cache.peek("cat") is None
+    assert built == []
+
+    ranking = cache.get("cat")
+    assert cache.peek("Cat") is ranking
+
+    # Evicted: peek misses again instead of rebuilding
+    cache.get("dog")
+    assert cache.peek("cat") is None
+    assert built == ["cat", "dog"]
@@ -0,0 +1,63 @@
+import os
+import time
+import numpy as np
+import pytest
+from script.ranking import SecretRanking
+from script.secret_pool import SecretPool, SecretPoolArchive, write_archive
+
+
+def build(secret: str) -> SecretRanking:
+    scores = np.array([1.0, 0.5])
+    order = np.array([0, 1], dtype=np.int32)
+    return SecretRanking(secret, np.ones(2, dtype=np.float32), scores, order, scores, order + 1)
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_empty_difficulty_does_not_stop_the_refill_thread():
+    pool = SecretPool({'easy': ['cat', 'dog'], 'medium': ['tree'], 'hard': []}, build, warm=2)
+    pool.start()
+    try:
+        assert wait_for(lambda: pool.ready('easy') == 2 and pool.ready('medium') == 2)
+        assert pool.take('hard') is None
+
+        secret, ranking = pool.take('easy')
+        assert secret in ('cat', 'dog')
+        assert ranking.secret_word == secret
+        # Still alive: the taken secret is replaced
+        assert wait_for(lambda: pool.ready('easy') == 2)
+        assert pool._thread.is_alive()
+    finally:
+        pool.close()
+
+
+def test_failed_build_is_retried():
+    attempts = []
+
+    def flaky(secret: str) -> SecretRanking:
+        attempts.append(secret)
+        if len(attempts) == 1:
+            raise RuntimeError("model not loaded yet")
+        return build(secret)
+
+    pool = SecretPool({'easy': ['cat']}, flaky, warm=1)
+    pool.start()
+    try:
+        assert wait_for(lambda: pool.ready('easy') == 1)
+    finally:
+        pool.close()
+
+
+def test_empty_archive_is_not_written(tmp_path):
+    path = str(tmp_path / "hard.pool")
+    with pytest.raises(ValueError):
+        write_archive(path, ["cat", "dog"], [], build, b"model|float32")
+    assert not os.path.exists(path)
+    assert SecretPoolArchive.open(path, ["cat", "dog"], b"model|float32") is None
@@ -0,0 +1,111 @@
+import pytest
+from session_backends import SQLiteSessionBackend
+from session_store import GameSession, SessionStore
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two workers' stores sharing one SQLite file, flushed by hand"""
+    path = str(tmp_path / "sessions.sqlite3")
+    stores = [SessionStore(backend=SQLiteSessionBackend(path), flush_interval_ms=60_000) for _ in range(2)]
+    yield stores
+    for store in stores:
+        store.close()
+
+
+def flush(store: SessionStore):
+    store.writer._flush_once()
+
+
+def new_game(store: SessionStore) -> GameSession:
+    session = GameSession("g1", secret_index=7, mode="practice", difficulty="easy")
+    store.add(session)
+    flush(store)
+    return session
+
+
+def test_stale_worker_does_not_undo_a_win(workers):
+    a, b = workers
+    new_game(a)
+    b.refresh("g1")
+    stale = b.get("g1")
+
+    won = a.get("g1")
+    won.seen_words.add("cat")
+    won.guesses.append(("cat", 1, 1.0, won.started_at))
+    won.won = True
+    won.completed_at = won.started_at + 5
+    a.save(won, won.guesses[-1])
+    flush(a)
+
+    # b hasn't seen the win and saves a hint on its old copy
+    stale.hint_cursor = 3
+    stale.seen_words.add("dog")
+    b.save(stale)
+    flush(b)
+
+    doc = a.backend.load("g1")
+    assert doc['won'] is True
+    assert doc['completed_at'] is not None
+    assert doc['hint_cursor'] == 3
+    assert doc['seen_words'] == ["cat", "dog"]
+    assert [g['word'] for g in doc['guesses']] == ["cat"]
+
+
+def test_hint_cursor_only_moves_forward(workers):
+    a, b = workers
+    new_game(a)
+    b.refresh("g1")
+    ahead = a.get("g1")
+    ahead.hint_cursor = 10
+    a.save(ahead)
+    flush(a)
+
+    behind = b.get("g1")
+    behind.hint_cursor = 4
+    b.save(behind)
+    flush(b)
+    assert a.backend.load("g1")['hint_cursor'] == 10
+
+
+def test_refresh_reloads_only_after_another_workers_write(workers):
+    a, b = workers
+    session = new_game(a)
+    session.hint_cursor = 2
+    a.save(session)
+    flush(a)
+
+    # Its own writes don't make a worker reload
+    a.refresh("g1")
+    assert a.get("g1") is session
+
+    b.refresh("g1")
+    other = b.get("g1")
+    other.hint_cursor = 5
+    b.save(other)
+    flush(b)
+
+    a.refresh("g1")
+    assert a.get("g1") is not session
+    assert a.get("g1").hint_cursor == 5
+
+
+def test_refresh_keeps_local_copy_when_backend_fails(workers, monkeypatch):
+    a, _ = workers
+    session = new_game(a)
+
+    def unavailable(game_id):
+        raise OSError("backend down")
+
+    monkeypatch.setattr(a.backend, "version", unavailable)
+    monkeypatch.setattr(a.backend, "load", unavailable)
+    a.refresh("g1")
+    assert a.get("g1", load=False) is session
+
+
+def test_refresh_loads_on_cache_miss(workers):
+    a, b = workers
+    new_game(a)
+    assert "g1" not in b
+    b.refresh("g1")
+    assert "g1" in b
@@ -0,0 +1,37 @@
+import os
+import numpy as np
+from script.ranking import SecretRanking, SharedRankings
+
+WORDS = ["cat", "dog", "tree", "house"]
+MINILM = b"all-MiniLM-L6-v2|float32"
+
+
+def ranking(secret: str) -> SecretRanking:
+    scores = np.array([1.0, 0.8, 0.3, 0.1])
+    order = np.argsort(-scores).astype(np.int32)
+    ranks = np.empty(len(order), dtype=np.int32)
+    ranks[order] = np.arange(1, len(order) + 1)
+    return SecretRanking(secret, np.ones(3, dtype=np.float32), scores, order, scores[order], ranks)
+
+
+def test_same_vocabulary_and_label_maps_the_file(tmp_path):
+    SharedRankings(str(tmp_path), WORDS, MINILM).store(ranking("cat"))
+    loaded = SharedRankings(str(tmp_path), WORDS, MINILM).load("cat")
+    assert loaded is not None
+    assert loaded.rank_of(1) == 2
+
+
+def test_other_label_is_ignored_and_pruned(tmp_path):
+    shared = SharedRankings(str(tmp_path), WORDS, MINILM)
+    shared.store(ranking("cat"))
+    path = shared.path_for("cat")
+
+    other = SharedRankings(str(tmp_path), WORDS, b"all-MiniLM-L6-v2|int8")
+    assert not os.path.exists(path)
+    assert other.load("cat") is None
+
+
+def test_other_vocabulary_is_pruned(tmp_path):
+    SharedRankings(str(tmp_path), WORDS, MINILM).store(ranking("cat"))
+    SharedRankings(str(tmp_path), WORDS[::-1], MINILM)
+    assert not any(name.endswith(".rank") for name in os.listdir(tmp_path))
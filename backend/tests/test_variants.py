@@ -0,0 +1,71 @@
+import pytest
+from script import variants
+from script.variants import VariantIndex
+
+
+class FakeWordNet:
+    """Just enough of nltk's WordNet reader: lemma lookup and morphy"""
+    LEMMAS = {
+        'summer', 'forest', 'news', 'butter', 'manner', 'number', 'better',
+        'sum', 'for', 'new', 'but', 'man', 'numb', 'bet', 'cat', 'mouse', 'horse', 'hose', 'dog'
+    }
+    MORPHY = {
+        ('cats', 'n'): 'cat',
+        ('mice', 'n'): 'mouse',
+        ('dogs', 'n'): 'dog',
+        # What WordNet's adjective rules really do with a lemma like 'number'
+        ('number', 'a'): 'numb',
+        ('summer', 'n'): 'summer',
+    }
+
+    def lemmas(self, word):
+        return [word] if word in self.LEMMAS else []
+
+    def morphy(self, word, pos):
+        return self.MORPHY.get((word, pos))
+
+
+VOCABULARY = ['horse', 'hose', 'cat', 'mouse', 'dog', 'email', 'sum', 'for', 'new', 'but', 'man', 'numb', 'bet']
+
+
+@pytest.fixture
+def index(monkeypatch):
+    monkeypatch.setattr(variants, 'wordnet', lambda: FakeWordNet())
+    return VariantIndex(VOCABULARY, {word: i for i, word in enumerate(VOCABULARY)})
+
+
+def resolved_word(index, guess, secret=None):
+    match = index.resolve(guess, exclude=VOCABULARY.index(secret) if secret else None)
+    return None if match is None else (VOCABULARY[match[0]], match[1])
+
+
+@pytest.mark.parametrize('guess', ['summer', 'forest', 'news', 'butter', 'manner', 'number', 'better'])
+def test_real_words_are_not_stripped_to_other_words(index, guess):
+    assert resolved_word(index, guess) is None
+
+
+def test_inflections_resolve_through_morphy(index):
+    assert resolved_word(index, 'cats') == ('cat', 'inflection')
+    assert resolved_word(index, 'mice') == ('mouse', 'inflection')
+
+
+def test_words_wordnet_lacks_use_suffix_rules_and_typos(index):
+    assert resolved_word(index, 'emails') == ('email', 'inflection')
+    assert resolved_word(index, 'hrose') == ('horse', 'typo')
+
+
+def test_secret_as_best_candidate_resolves_to_nothing(index):
+    # Not the next candidate ('hose'): the guess goes to the model instead
+    assert resolved_word(index, 'hrose', secret='horse') is None
+    assert resolved_word(index, 'dogs', secret='dog') is None
+    assert resolved_word(index, 'cats', secret='dog') == ('cat', 'inflection')
+
+
+def test_nothing_resolves_without_wordnet(monkeypatch):
+    def unavailable():
+        raise LookupError('wordnet not downloaded')
+
+    monkeypatch.setattr(variants, 'wordnet', unavailable)
+    index = VariantIndex(VOCABULARY, {word: i for i, word in enumerate(VOCABULARY)})
+    assert index.resolve('cats') is None
+    assert index.resolve('summer') is None
@@ -0,0 +1,111 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+from game_manager import GameManager
+from script.layer_score import LayeredScoring
+from script.embeddings import as_shared_matrix, build_embedding_matrix
+from script.snapshot import load_snapshot, write_snapshot
+from script.quantization import quantize
+from config import SNAPSHOT_PATH, MODEL_NAME, MODEL_LOAD, EMBEDDING_STORAGE, EMBEDDING_PQ_M, EMBEDDING_PQ_NBITS
+
+
+class Warmup:
+    """Tracks the startup stages and how long each one took"""
+    STAGES = ('vocabulary', 'model', 'embeddings', 'wordnet', 'game_manager')
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.current: Optional[str] = None
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        with self._lock:
+            self.current = name
+            if self.started_at is None:
+                self.started_at = time.time()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.timings[name] = round(elapsed_ms, 1)
+                self.current = None
+            print(f"⏱️  Warmup stage '{name}' took {elapsed_ms:.0f}ms")
+
+    def fail(self, error: Exception):
+        self.error = f"{type(error).__name__}: {error}"
+
+    def finish(self):
+        self.finished_at = time.time()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def report(self) -> Dict:
+        return {
+            'ready': self.done,
+            'current_stage': self.current,
+            'error': self.error,
+            'stages_ms': {name: self.timings[name] for name in self.STAGES if name in self.timings},
+            'total_ms': round(sum(self.timings.values()), 1)
+        }
+
+
+def build_game_manager(warmup: Warmup) -> GameManager:
+    """Load everything a game needs, one timed stage at a time"""
+    with warmup.stage('vocabulary'):
+        snapshot = load_snapshot(SNAPSHOT_PATH)
+        if snapshot is not None and snapshot.model != MODEL_NAME:
+            print(f"⚠️  Snapshot was built with {snapshot.model}, not {MODEL_NAME}; re-encoding")
+            word_list, frequency_ranks, word_embeddings = snapshot.words, list(snapshot.frequency_ranks), None
+        elif snapshot is not None:
+            word_list, frequency_ranks = snapshot.words, None
+            word_embeddings = as_shared_matrix(snapshot.embeddings)
+        else:
+            # No snapshot yet: one-time fallback to MongoDB
+            from database import load_reference_words
+            word_list, frequency_ranks = load_reference_words()
+            word_embeddings = None
+        word_list = [str(w) for w in word_list]
+        print(f"Successfully loaded {len(word_list)} words")
+
+    with warmup.stage('model'):
+        scorer = LayeredScoring()
+        if MODEL_LOAD == 'eager':
+            scorer.model.load()
+
+    with warmup.stage('embeddings'):
+        if word_embeddings is None:
+            print("No precomputed embedding matrix found, encoding vocabulary once...")
+            word_embeddings = build_embedding_matrix(word_list, scorer.model)
+            try:
+                write_snapshot(SNAPSHOT_PATH, word_list, word_embeddings, MODEL_NAME, frequency_ranks)
+            except OSError as e:
+                print(f"⚠️  Could not write vocabulary snapshot: {e}")
+
+        word_embeddings = quantize(
+            word_embeddings,
+            EMBEDDING_STORAGE,
+            pq_m=EMBEDDING_PQ_M,
+            pq_nbits=EMBEDDING_PQ_NBITS
+        )
+
+    with warmup.stage('wordnet'):
+        scorer.load_vocabulary(word_list, word_embeddings)
+
+    with warmup.stage('game_manager'):
+        game_manager = GameManager(
+            reference_words=word_list,
+            reference_embeddings=word_embeddings,
+            scorer=scorer
+        )
+
+    warmup.finish()
+    return game_manager